@@ -1,10 +1,6 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-from src.helper import *
 st.set_page_config(page_title="Sticker Sales Forecasting | Rank 120", page_icon="🏷️", layout="wide")
-from src.eda_page import eda_page
-from src.results_page import results_page
+# each page module (and the libraries it pulls in) is imported only when that page is shown
 
 
 with st.sidebar:
@@ -12,17 +8,25 @@ with st.sidebar:
     st.title("🏷️ Sales Forecasting")
     st.markdown("**Kaggle Rank: 120** 🏆")
     st.header("Navigation")
-    options = st.radio("Select a page", ["🏠 Home", "🔍 EDA", "🏆 Results"])
-    
-    
+    options = st.radio("Select a page", ["🏠 Home", "🔍 EDA", "🏆 Results", "🧪 Scenarios", "⏱️ Performance"])
+
+
 if options == "🏠 Home":
+    from src.home_page import home_page
     home_page()
 elif options == "🔍 EDA":
+    from src.eda_page import eda_page
     eda_page()
 elif options == "🏆 Results":
+    from src.results_page import results_page
     results_page()
+elif options == "🧪 Scenarios":
+    from src.scenarios_page import scenarios_page
+    scenarios_page()
+elif options == "⏱️ Performance":
+    from src.performance_page import performance_page
+    performance_page()
 
 
 # df = pd.DataFrame(np.random.randn(10, 2), columns=["a", "b"])
 # st.line_chart(df)
-
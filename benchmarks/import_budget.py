@@ -0,0 +1,90 @@
+"""
+Import-time budget for the cold-start path.
+
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --slack 2     # scale every budget, e.g. on a slow runner
+
+Every target is imported (app.py is run, in Streamlit's bare mode) in a
+fresh interpreter, `--repeat` times, and the best time is checked against
+its budget. A target also fails if it pulls in a library it should not, or
+if it loads the competition data (a CFG data attribute computed) while
+importing. The exit status is 1 on any failure.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# only the pages and scripts that plot with them may import these
+HEAVY = ('matplotlib', 'seaborn', 'sklearn')
+# CFG attributes that read ./data when first accessed
+DATA = ('train_df', 'test_df', 'years_train', 'years_test', 'years', 'countries', 'stores', 'products')
+
+# target, budget in seconds, modules it must not import
+BUDGETS = [
+    ('src.cfg', 0.05, ('numpy', 'pandas', *HEAVY)),
+    ('src.forecaster', 1.0, ('plotly', 'streamlit', *HEAVY)),
+    ('src.service', 1.2, ('plotly', 'streamlit', *HEAVY)),
+    ('app.py', 1.5, ('pandas', 'src.helper', *HEAVY)),
+    ('src.home_page', 1.2, ('pandas', *HEAVY)),
+    ('src.eda_page', 2.0, HEAVY),
+    ('src.results_page', 2.0, HEAVY),
+    ('src.scenarios_page', 2.0, HEAVY),
+    ('src.performance_page', 2.0, HEAVY),
+]
+
+CHILD = """
+import importlib, json, runpy, sys, time
+target, watch, data = sys.argv[1], sys.argv[2].split(','), sys.argv[3].split(',')
+start = time.perf_counter()
+if target.endswith('.py'):
+    runpy.run_path(target, run_name='__main__')
+else:
+    importlib.import_module(target)
+seconds = time.perf_counter() - start
+imported = [m for m in watch if m in sys.modules]
+from src.cfg import CFG, lazy
+loaded = [n for n in data if not isinstance(vars(CFG)[n], lazy)]
+print(json.dumps({'seconds': seconds, 'imported': imported, 'loaded': loaded}))
+"""
+
+
+def measure(target: str, watch, repeat: int) -> dict:
+    """Best of `repeat` fresh-interpreter imports of `target`."""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-c', CHILD, target, ','.join(watch), ','.join(DATA)],
+            cwd=ROOT, env={**os.environ, 'PYTHONPATH': ROOT}, capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(runs, key=lambda r: r['seconds'])
+
+
+def check(slack: float, repeat: int) -> list:
+    failed = []
+    for target, budget, forbidden in BUDGETS:
+        result = measure(target, forbidden, repeat)
+        problems = []
+        if result['seconds'] > budget * slack:
+            problems.append(f"over budget {budget * slack:.2f}s")
+        if result['imported']:
+            problems.append(f"imports {', '.join(result['imported'])}")
+        if result['loaded']:
+            problems.append(f"loads CFG.{', CFG.'.join(result['loaded'])}")
+        print(f"{target:<22} {result['seconds']:7.3f}s  {'; '.join(problems) or 'ok'}", flush=True)
+        if problems:
+            failed.append(target)
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--slack', type=float, default=1.0, help='factor applied to every budget')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    if check(args.slack, args.repeat):
+        sys.exit(1)
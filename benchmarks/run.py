@@ -0,0 +1,230 @@
+"""
+Benchmark suite for the data, feature, EDA aggregation and model paths.
+
+    python benchmarks/run.py --scale 10x
+    python benchmarks/run.py --scale 10x --compare benchmarks/results/10x-<commit>.json
+
+Synthetic data (benchmarks/synthetic.py) is generated once per (scale, seed)
+under benchmarks/.data/. Every stage is timed `--repeat` times and the
+results are written as JSON to benchmarks/results/. With `--compare`, stages
+slower than the baseline by more than `--threshold` are flagged and the exit
+status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import SCALES, write_csvs  # noqa: E402
+from src.cube import SalesCube  # noqa: E402
+from src.data import CACHE_DIR, iter_data, load_data  # noqa: E402
+from src.downsample import MultiResolution  # noqa: E402
+from src.feategg import Feategg  # noqa: E402
+from src.forecaster import FactorForecaster  # noqa: E402
+from src.rollups import Rollups  # noqa: E402
+from src.spectral import fit_sincos, harmonics_by_date, periodogram  # noqa: E402
+
+AXES = ('country', 'store', 'product')
+
+
+def timed(fn, repeat: int, setup=None):
+    """Run `fn` `repeat` times (after `setup`, untimed); returns the last result and the timings."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, times
+
+
+def stages(data_dir: str):
+    """(name, setup, fn) in run order; later stages read what earlier ones put in `state`."""
+    train, test = os.path.join(data_dir, 'train.csv'), os.path.join(data_dir, 'test.csv')
+    state = {}
+
+    def drop_cache():
+        shutil.rmtree(os.path.join(data_dir, CACHE_DIR), ignore_errors=True)
+
+    # CFG reads ./data relative to the working directory: run it from a root
+    # whose data/ is the synthetic data set, so it loads the scaled CSVs
+    cfg_root = f'{data_dir}-root'
+    os.makedirs(cfg_root, exist_ok=True)
+    if not os.path.lexists(os.path.join(cfg_root, 'data')):
+        os.symlink(data_dir, os.path.join(cfg_root, 'data'))
+    env = {**os.environ, 'PYTHONPATH': ROOT}
+
+    def warm_cache():
+        load_data(train, test)
+
+    def cfg_import():
+        # fresh interpreters: the import alone, then the first CFG data access (from the column cache)
+        subprocess.run([sys.executable, '-c', 'import src.cfg'], cwd=cfg_root, env=env, check=True)
+
+    def cfg_data():
+        subprocess.run([sys.executable, '-c', 'from src.cfg import CFG; CFG.years'], cwd=cfg_root, env=env, check=True)
+
+    def load_cold():
+        state['df'] = load_data(train, test)
+
+    def load_cached():
+        # the EDA._load_data path
+        state['df'] = load_data(train, test)
+        state['train'] = state['df'][state['df']['test'] == 0]
+        state['labels'] = {axis: np.asarray(state['df'][axis].cat.categories) for axis in AXES}
+
+    def feategg():
+        state['feate'] = Feategg(state['df'])
+
+    def feategg_stream():
+        for _ in Feategg.stream(lambda: iter_data(train, test, chunksize=500_000)):
+            pass
+
+    def cube():
+        labels = state['labels']
+        state['cube'] = SalesCube.from_frame(state['train'], labels['country'], labels['store'], labels['product'])
+
+    def rollups_build():
+        state['rollups'] = Rollups.build(state['cube'], 'bench')
+
+    def eda_num_sold_date():
+        rollups = state['rollups']
+        MultiResolution(rollups.dates, rollups.daily).window(rollups.dates[0], rollups.dates[-1], 1000)
+
+    def eda_sell_trend():
+        for axis in AXES:
+            state['rollups'].yearly_frame(axis)
+
+    def eda_spectra():
+        cube = state['cube']
+        values = cube.values.reshape(len(cube.dates), -1)
+        basis = harmonics_by_date(state['feate'].train_df, cube.dates, ['sin 2t', 'cos 2t', 'sin t', 'cos t'])
+        periodogram(values)
+        fit_sincos(values, basis)
+
+    def model_fit():
+        labels = state['labels']
+        frame = state['feate'].df.copy()
+        frame['gdp_factor'] = frame['gdp_factor'].fillna(1.0)  # synthetic countries have no GDP series
+        state['frame'] = frame
+        state['model'] = FactorForecaster(
+            countries=labels['country'], stores=labels['store'], products=labels['product'],
+        ).fit(frame[frame['test'] == 0])
+
+    def model_predict():
+        state['model'].predict(state['frame'])
+
+    return [
+        ('cfg_import', None, cfg_import),
+        ('cfg_data', warm_cache, cfg_data),
+        ('load_cold', drop_cache, load_cold),
+        ('load_cached', None, load_cached),
+        ('feategg', None, feategg),
+        ('feategg_stream', None, feategg_stream),
+        ('cube', None, cube),
+        ('rollups_build', None, rollups_build),
+        ('eda_numSold_date', None, eda_num_sold_date),
+        ('eda_sellTrend', None, eda_sell_trend),
+        ('eda_spectra', None, eda_spectra),
+        ('model_fit', None, model_fit),
+        ('model_predict', None, model_predict),
+    ]
+
+
+def commit() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or 'unknown'
+    except OSError:
+        return 'unknown'
+
+
+def run(scale: str, seed: int, repeat: int, only=None) -> dict:
+    data_dir = os.path.join(ROOT, 'benchmarks', '.data', f'{scale}-{seed}')
+    if not os.path.exists(os.path.join(data_dir, 'test.csv')):
+        write_csvs(data_dir, scale, seed)
+
+    results = {}
+    for name, setup, fn in stages(data_dir):
+        # stages feed each other, so skipped ones still run once, untimed
+        _, times = timed(fn, repeat if only is None or name in only else 1, setup)
+        if only is None or name in only:
+            results[name] = {'best_s': min(times), 'median_s': statistics.median(times)}
+            print(f"{name:<18} {min(times):9.4f}s  (median {statistics.median(times):.4f}s)", flush=True)
+
+    countries, stores, products, years = SCALES[scale]
+    return {
+        'scale': scale,
+        'seed': seed,
+        'repeat': repeat,
+        'series': countries * stores * products,
+        'train_years': years,
+        'commit': commit(),
+        'timestamp': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'stages': results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float, min_delta: float = 0.01) -> list:
+    """
+    Stages whose best time grew by more than `threshold` (a ratio) and by at
+    least `min_delta` seconds relative to `baseline`; the absolute floor keeps
+    millisecond stages from flagging on timer noise.
+    """
+    flagged = []
+    for name, now in current['stages'].items():
+        before = baseline['stages'].get(name)
+        if before is None:
+            continue
+        ratio = now['best_s'] / max(before['best_s'], 1e-9)
+        slower = ratio > threshold and now['best_s'] - before['best_s'] > min_delta
+        mark = 'REGRESSION' if slower else ''
+        print(f"{name:<18} {before['best_s']:9.4f}s -> {now['best_s']:9.4f}s  x{ratio:5.2f}  {mark}")
+        if slower:
+            flagged.append(name)
+    return flagged
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='1x')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='*', help='stages to time (others run once, untimed)')
+    parser.add_argument('--out', help='result file (default: benchmarks/results/<scale>-<commit>.json)')
+    parser.add_argument('--compare', help='baseline result file')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio flagged as a regression')
+    parser.add_argument('--min-delta', type=float, default=0.01, help='seconds a stage must slow down by to be flagged')
+    args = parser.parse_args()
+
+    result = run(args.scale, args.seed, args.repeat, args.only)
+    out = args.out or os.path.join(ROOT, 'benchmarks', 'results', f"{args.scale}-{result['commit']}.json")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"wrote {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['scale'] != result['scale']:
+            sys.exit(f"baseline is for scale {baseline['scale']}, not {result['scale']}")
+        if compare(result, baseline, args.threshold, args.min_delta):
+            sys.exit(1)
@@ -0,0 +1,74 @@
+"""
+Latency / throughput client for the prediction service (src/service.py).
+
+    python -m src.service &
+    python benchmarks/service_client.py --requests 2000 --rows 1 --concurrency 64
+
+Sends random (date, country, store, product) queries from the test horizon
+and reports latency percentiles and rows per second.
+"""
+import argparse
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+COUNTRIES = ['Canada', 'Finland', 'Italy', 'Kenya', 'Norway', 'Singapore']
+STORES = ['Discount Stickers', 'Stickers for Less', 'Premium Sticker Mart']
+PRODUCTS = ['Holographic Goose', 'Kaggle', 'Kaggle Tiers', 'Kerneler', 'Kerneler Dark Mode']
+
+
+def make_payloads(n_requests: int, rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    dates = np.arange('2017-01-01', '2020-01-01', dtype='datetime64[D]')
+    payloads = []
+    for _ in range(n_requests):
+        payloads.append(json.dumps({'rows': [
+            {
+                'date': str(rng.choice(dates)),
+                'country': str(rng.choice(COUNTRIES)),
+                'store': str(rng.choice(STORES)),
+                'product': str(rng.choice(PRODUCTS)),
+            }
+            for _ in range(rows)
+        ]}).encode())
+    return payloads
+
+
+def post(url: str, payload: bytes) -> float:
+    start = time.perf_counter()
+    req = urllib.request.Request(url, data=payload, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req) as resp:
+        resp.read()
+    return time.perf_counter() - start
+
+
+def run(url: str, n_requests: int, rows: int, concurrency: int) -> dict:
+    payloads = make_payloads(n_requests, rows)
+    post(url, payloads[0])  # warm up the connection path
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = np.array(list(pool.map(lambda p: post(url, p), payloads))) * 1000
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': n_requests,
+        'rows_per_request': rows,
+        'concurrency': concurrency,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'requests_per_s': n_requests / elapsed,
+        'rows_per_s': n_requests * rows / elapsed,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8502/predict')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--rows', type=int, default=1, help='rows per request')
+    parser.add_argument('--concurrency', type=int, default=64)
+    args = parser.parse_args()
+    print(json.dumps(run(args.url, args.requests, args.rows, args.concurrency), indent=2))
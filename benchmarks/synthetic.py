@@ -0,0 +1,110 @@
+"""
+Deterministic synthetic sales in the train.csv / test.csv schema.
+
+    python benchmarks/synthetic.py --scale 10x --out /tmp/sales-10x
+
+The real labels come first on every axis, so Kenya / Canada and the 'Kaggle'
+reference product keep their roles; extra labels are numbered. The same
+(scale, seed) always writes the same files: every year is drawn from its own
+seeded Generator.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+COUNTRIES = ['Canada', 'Finland', 'Italy', 'Kenya', 'Norway', 'Singapore']
+STORES = ['Discount Stickers', 'Stickers for Less', 'Premium Sticker Mart']
+PRODUCTS = ['Holographic Goose', 'Kaggle', 'Kaggle Tiers', 'Kerneler', 'Kerneler Dark Mode']
+
+# scale -> (countries, stores, products, train years); rows grow by roughly the scale
+SCALES = {
+    '1x': (6, 3, 5, 7),
+    '10x': (15, 6, 10, 7),
+    '100x': (30, 10, 15, 14),
+}
+TEST_YEARS = 3
+FIRST_YEAR = 2010
+
+
+def labels(real: list, n: int, name: str) -> list:
+    return real[:n] + [f'{name} {i:03d}' for i in range(len(real), n)]
+
+
+def make_axes(countries: int, stores: int, products: int):
+    return labels(COUNTRIES, countries, 'Country'), labels(STORES, stores, 'Store'), labels(PRODUCTS, products, 'Product')
+
+
+def sales_year(year: int, countries, stores, products, seed: int = 0) -> pd.DataFrame:
+    """One year of rows, date-major like train.csv, without the id column."""
+    rng = np.random.default_rng([seed, year])
+    meta = np.random.default_rng([seed, 0])  # level / phase parameters, shared by all years
+    n_c, n_s, n_p = len(countries), len(stores), len(products)
+    country_level = meta.lognormal(4.5, 0.8, n_c)
+    store_level = meta.lognormal(0.0, 0.4, n_s)
+    product_level = meta.lognormal(0.0, 0.3, n_p)
+    product_phase = meta.uniform(0, 2 * np.pi, n_p)
+    weekday = np.array([1.0, 1.0, 1.0, 1.0, 1.05, 1.35, 1.4])
+
+    dates = pd.date_range(f'{year}-01-01', f'{year}-12-31', freq='D')
+    t = 2 * np.pi * (dates.dayofyear.to_numpy() - 1) / (365 + dates.is_leap_year)
+    growth = 1.03 ** (year - FIRST_YEAR)
+
+    level = (
+        country_level[None, :, None, None]
+        * store_level[None, None, :, None]
+        * product_level[None, None, None, :]
+        * (1 + 0.3 * np.sin(t[:, None] + product_phase[None, :]))[:, None, None, :]
+        * weekday[dates.weekday.to_numpy()][:, None, None, None]
+        * growth
+    )
+    num_sold = np.round(level * rng.lognormal(0.0, 0.1, level.shape))
+    # Canada and Kenya have gaps, as in the competition data
+    gaps = np.isin(np.asarray(countries), ['Canada', 'Kenya'])[None, :, None, None] & (rng.random(level.shape) < 0.05)
+    num_sold[gaps] = np.nan
+
+    shape = (len(dates), n_c, n_s, n_p)
+    code = np.indices(shape).reshape(4, -1)
+    return pd.DataFrame({
+        'date': dates[code[0]],
+        'country': pd.Categorical.from_codes(code[1], categories=countries),
+        'store': pd.Categorical.from_codes(code[2], categories=stores),
+        'product': pd.Categorical.from_codes(code[3], categories=products),
+        'num_sold': num_sold.reshape(-1),
+    })
+
+
+def iter_sales(scale: str = '1x', seed: int = 0):
+    """(year, rows, is_test) for every train and test year of `scale`, one year in memory at a time."""
+    countries, stores, products, train_years = SCALES[scale]
+    axes = make_axes(countries, stores, products)
+    for n in range(train_years + TEST_YEARS):
+        yield FIRST_YEAR + n, sales_year(FIRST_YEAR + n, *axes, seed=seed), n >= train_years
+
+
+def write_csvs(directory: str, scale: str = '1x', seed: int = 0):
+    """Write `train.csv` and `test.csv` (no num_sold) under `directory`; returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = {flag: os.path.join(directory, name) for flag, name in ((False, 'train.csv'), (True, 'test.csv'))}
+    for path in paths.values():
+        if os.path.exists(path):
+            os.remove(path)
+    next_id = 0
+    for _, rows, is_test in iter_sales(scale, seed):
+        rows.insert(0, 'id', np.arange(next_id, next_id + len(rows)))
+        next_id += len(rows)
+        if is_test:
+            rows = rows.drop(columns='num_sold')
+        path = paths[is_test]
+        rows.to_csv(path, mode='a', header=not os.path.exists(path), index=False, date_format='%Y-%m-%d')
+    return paths[False], paths[True]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='1x')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True, help='directory for train.csv / test.csv')
+    args = parser.parse_args()
+    print(*write_csvs(args.out, args.scale, args.seed), sep='\n')
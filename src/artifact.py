@@ -0,0 +1,191 @@
+"""
+Compact model artifact: fitted FactorForecaster factors, category indexes and
+the EDA aggregates (sales cube, rollups, sin/cos design) as one .npy file per
+array plus meta.json. Arrays are opened with `mmap_mode='r'`, so processes
+serving the dashboard or predictions share the same pages and start without
+touching the raw CSVs.
+
+The directory name carries the format and data version; a new data version
+builds a new artifact and drops the stale ones. meta.json also records the
+size and mtime of the training CSV, so opening only hashes the CSV when
+that stamp has changed.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from src.cfg import CFG
+from src.cube import SalesCube
+from src.data import CACHE_DIR, data_stamp, data_version, load_data, staging_dir
+from src.feategg import Feategg
+from src.forecaster import FactorForecaster
+from src.profiling import stage
+from src.rollups import AXES, Rollups
+from src.spectral import harmonics_by_date
+
+
+FORMAT = 1  # bump when the stored arrays or their meaning change
+ROOT = os.path.join('./data', CACHE_DIR)
+FITTED = ('store_factor_', 'product_intercept_', 'product_coef_', 'weekday_factor_', 'sincos_coef_', 'country_factor_')
+SCALARS = ('sincos_intercept_', 'constant_')
+PARAMS = ('product_basis', 'sincos_basis', 'alpha', 'const_scale', 'excluded_countries', 'reference_product')
+
+
+def artifact_path(version: str, root: str = ROOT) -> str:
+    return os.path.join(root, f'artifact-v{FORMAT}-{version}')
+
+
+class Artifact:
+    """Read-only view of an exported artifact; every array is a memmap."""
+    def __init__(self, meta: dict, arrays: dict):
+        self.meta = meta
+        self.arrays = arrays
+        self.version = meta['version']
+        self.labels = {axis: np.asarray(meta['labels'][axis], dtype=object) for axis in AXES}
+
+    @property
+    def model(self) -> FactorForecaster:
+        # predict-ready; the partial_fit statistics are not stored
+        model = FactorForecaster(
+            **self.meta['params'],
+            countries=self.labels['country'], stores=self.labels['store'], products=self.labels['product'],
+        )
+        for name in FITTED:
+            setattr(model, name, self.arrays[name])
+        for name in SCALARS:
+            setattr(model, name, self.meta['scalars'][name])
+        return model
+
+    @property
+    def cube(self) -> SalesCube:
+        return SalesCube(pd.DatetimeIndex(self.arrays['dates']), self.arrays['cube'],
+                         self.labels['country'], self.labels['store'], self.labels['product'])
+
+    @property
+    def rollups(self) -> Rollups:
+        return Rollups(
+            self.version,
+            self.arrays['dates'],
+            self.arrays['daily'],
+            self.arrays['years'],
+            {a: self.arrays[f'yearly_{a}'] for a in AXES},
+            self.labels,
+        )
+
+    @property
+    def sincos_basis(self) -> np.ndarray:
+        return self.arrays['sincos_basis']
+
+
+def export(target: str, version: str, model: FactorForecaster, cube: SalesCube, rollups: Rollups, sincos_basis: np.ndarray, stamp: str = None):
+    """Write the artifact directory atomically; a concurrent writer of the same version wins harmlessly."""
+    arrays = {name: np.asarray(getattr(model, name)) for name in FITTED}
+    arrays.update({
+        'dates': cube.dates.to_numpy().astype('datetime64[D]'),
+        'cube': cube.values,
+        'daily': rollups.daily,
+        'years': rollups.years,
+        'sincos_basis': sincos_basis,
+        **{f'yearly_{a}': rollups.yearly[a] for a in AXES},
+    })
+    meta = {
+        'format': FORMAT,
+        'version': version,
+        'stamp': stamp,
+        'labels': {a: [str(x) for x in cube.labels[a]] for a in AXES},
+        'params': {name: getattr(model, name) for name in PARAMS},
+        'scalars': {name: float(getattr(model, name)) for name in SCALARS},
+        'arrays': sorted(arrays),
+    }
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = staging_dir(os.path.dirname(target))
+    for name, values in arrays.items():
+        np.save(os.path.join(tmp, f'{name}.npy'), np.ascontiguousarray(values), allow_pickle=False)
+    with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    try:
+        os.replace(tmp, target)
+    except OSError:  # another process won the race
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def read(target: str) -> Artifact:
+    with open(os.path.join(target, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta['format'] != FORMAT:
+        raise ValueError(f"artifact format {meta['format']}, expected {FORMAT}")
+    arrays = {name: np.load(os.path.join(target, f'{name}.npy'), mmap_mode='r', allow_pickle=False) for name in meta['arrays']}
+    return Artifact(meta, arrays)
+
+
+@stage('build_artifact')
+def build(target: str, version: str, stamp: str = None):
+    """Fit everything from the raw data and export it to `target`."""
+    df = load_data()
+    feate = Feategg(df)
+    model = FactorForecaster().fit(feate.train_df)
+    cube = SalesCube.from_frame(feate.train_df)
+    rollups = Rollups.open(os.path.join(ROOT, 'rollups.npz'), cube, version)
+    sincos_basis = harmonics_by_date(feate.train_df, cube.dates, CFG.sincoscol2)
+    export(target, version, model, cube, rollups, sincos_basis, stamp)
+
+
+def _drop_stale(root: str, keep: str):
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name.startswith('artifact-') and path != keep and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _stamped(root: str, stamp: str):
+    # the artifact directory whose meta.json records `stamp`, if any
+    prefix = f'artifact-v{FORMAT}-'
+    for name in os.listdir(root) if os.path.isdir(root) else []:
+        meta = os.path.join(root, name, 'meta.json')
+        if name.startswith(prefix) and os.path.exists(meta):
+            with open(meta) as f:
+                if json.load(f).get('stamp') == stamp:
+                    return os.path.join(root, name)
+    return None
+
+
+def _restamp(target: str, stamp: str):
+    # same content under a new size / mtime (e.g. a touched or re-copied CSV)
+    with open(os.path.join(target, 'meta.json')) as f:
+        meta = json.load(f)
+    meta['stamp'] = stamp
+    tmp = os.path.join(target, 'meta.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(target, 'meta.json'))
+
+
+@stage('open_artifact')
+def open_artifact(train_path: str = './data/train.csv', root: str = ROOT) -> Artifact:
+    """
+    The artifact for the current training data, exporting it first if it is
+    missing or stale. The CSV is only hashed when its size / mtime stamp
+    matches no artifact.
+    """
+    stamp = data_stamp(train_path)
+    target = _stamped(root, stamp)
+    if target is not None:
+        return read(target)
+
+    version = data_version(train_path)
+    target = artifact_path(version, root)
+    if os.path.isdir(target):
+        _restamp(target, stamp)
+    else:
+        build(target, version, stamp)
+        _drop_stale(root, target)
+    return read(target)
+
+
+if __name__ == '__main__':
+    # python -m src.artifact: export ahead of time, e.g. in a deploy step
+    art = open_artifact()
+    print(artifact_path(art.version), sum(a.nbytes for a in art.arrays.values()) / 2 ** 20, 'MiB')
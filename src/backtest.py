@@ -0,0 +1,145 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from src.forecaster import FactorForecaster
+
+
+FORMAT = 1  # bump when FactorForecaster, the fold fitting or the metrics change: cached scores are keyed on it
+
+
+@lru_cache(maxsize=None)
+def metrics() -> dict:
+    # sklearn costs about a second to import, so it is only loaded once something is scored
+    from sklearn.metrics import (
+        mean_absolute_error,
+        mean_absolute_percentage_error,
+        mean_squared_error,
+        r2_score,
+    )
+    return {
+        'MAPE': mean_absolute_percentage_error,
+        'MAE': mean_absolute_error,
+        'RMSE': lambda y, p: np.sqrt(mean_squared_error(y, p)),
+        'R²': r2_score,
+    }
+
+
+def make_folds(years, min_train_years: int = 3, horizon: int = 1, expanding: bool = True):
+    """
+    Rolling-origin folds over `years`: each fold trains on the years before the
+    origin (all of them if `expanding`, else the last `min_train_years`) and
+    validates on the next `horizon` years.
+    """
+    years = sorted(int(y) for y in years)
+    folds = []
+    for origin in range(min_train_years, len(years) - horizon + 1):
+        train = years[:origin] if expanding else years[origin - min_train_years:origin]
+        folds.append((tuple(train), tuple(years[origin:origin + horizon])))
+    return folds
+
+
+def score(y: np.ndarray, pred: np.ndarray) -> dict:
+    ok = np.isfinite(y) & np.isfinite(pred)
+    return {name: float(fn(y[ok], pred[ok])) for name, fn in metrics().items()}
+
+
+# frame and category labels shared with the pool workers (pickled once per worker)
+_FRAME = None
+_LABELS = {}
+
+def _init_worker(frame: pd.DataFrame, labels: dict):
+    global _FRAME, _LABELS
+    _FRAME, _LABELS = frame, labels
+
+
+def _run_fold(config: dict, fold) -> dict:
+    train_years, valid_years = fold
+    year = _FRAME['year'].to_numpy()
+    train = _FRAME[np.isin(year, train_years)]
+    valid = _FRAME[np.isin(year, valid_years)]
+
+    model = FactorForecaster(**_LABELS, **config).fit(train)
+    return {
+        'train': score(train['num_sold'].to_numpy(dtype=float), model.predict(train)),
+        'valid': score(valid['num_sold'].to_numpy(dtype=float), model.predict(valid)),
+    }
+
+
+class Backtester:
+    """
+    Fits and scores FactorForecaster configurations on rolling-origin folds
+    in a process pool. Each (config, fold) result is cached as JSON under
+    `cache_dir`, keyed on `FORMAT` and the data version, so reruns only fit
+    what changed.
+    """
+    def __init__(self, frame: pd.DataFrame, version: str, cache_dir: str = './data/.cache/backtest'):
+        self.frame = frame
+        self.version = version
+        self.cache_dir = cache_dir
+
+    def _key(self, config: dict, fold) -> str:
+        raw = json.dumps([FORMAT, self.version, sorted(config.items()), fold], default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    def _cached(self, key: str):
+        try:
+            with open(os.path.join(self.cache_dir, f'{key}.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key: str, result: dict):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = os.path.join(self.cache_dir, f'{key}.json.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(result, f)
+            os.replace(tmp, os.path.join(self.cache_dir, f'{key}.json'))
+        except OSError:
+            pass
+
+    def run(self, configs, folds, workers: int = None) -> pd.DataFrame:
+        """Long frame with one row per (config, fold, split) and one column per metric."""
+        configs = [dict(c) for c in configs]
+        jobs = [(n, config, fold) for n, config in enumerate(configs) for fold in folds]
+        results = {}
+        todo = []
+        for n, config, fold in jobs:
+            key = self._key(config, fold)
+            cached = self._cached(key)
+            if cached is None:
+                todo.append((n, config, fold, key))
+            else:
+                results[(n, fold)] = cached
+
+        if todo:
+            # never fork: the caller may be the multi-threaded Streamlit server, and a
+            # forked child can inherit locks held by other threads. Workers get the
+            # labels from here so they do not load the CSVs through CFG themselves.
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            model = FactorForecaster()
+            labels = {'countries': model.countries, 'stores': model.stores, 'products': model.products}
+            with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker, initargs=(self.frame, labels)) as pool:
+                futures = {pool.submit(_run_fold, config, fold): (n, fold, key) for n, config, fold, key in todo}
+                for future, (n, fold, key) in futures.items():
+                    results[(n, fold)] = future.result()
+                    self._store(key, results[(n, fold)])
+
+        rows = []
+        for n, config, fold in jobs:
+            for split, metrics in results[(n, fold)].items():
+                rows.append({
+                    'config': n,
+                    'train_years': f'{fold[0][0]}-{fold[0][-1]}',
+                    'valid_years': f'{fold[1][0]}-{fold[1][-1]}',
+                    'split': split,
+                    **metrics,
+                })
+        return pd.DataFrame(rows)
@@ -1,21 +1,73 @@
-import pandas as pd
+import threading
+
+
+class lazy:
+    """
+    Class attribute computed from the class on first access and then stored
+    on it, so later reads are plain lookups. A lock keeps concurrent first
+    reads (Streamlit sessions) from loading the data twice.
+    """
+    _lock = threading.RLock()
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.name = fn.__name__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner):
+        with self._lock:
+            value = owner.__dict__[self.name]
+            if value is self:
+                value = self.fn(owner)
+                setattr(owner, self.name, value)
+        return value
+
 
 class CFG:
-    train_df = pd.read_csv('./data/train.csv')
-    test_df = pd.read_csv('./data/test.csv')
-    train_df.date = pd.DatetimeIndex(train_df.date)
-    test_df.date = pd.DatetimeIndex(test_df.date)
-    
-    years_train = train_df.date.dt.year.unique()
-    years_test = test_df.date.dt.year.unique()
-    years = pd.concat([train_df, test_df]).date.dt.year.unique()
-    
+    # data-derived attributes are loaded on first access, not at import, and
+    # pandas with them: `CFG.alpha3` alone costs no data or library loads
+    @lazy
+    def train_df(cls):
+        from src.data import load_csv
+        return load_csv('./data/train.csv')
+
+    @lazy
+    def test_df(cls):
+        from src.data import load_csv
+        return load_csv('./data/test.csv')
+
+    @lazy
+    def years_train(cls):
+        return cls.train_df.date.dt.year.unique()
+
+    @lazy
+    def years_test(cls):
+        return cls.test_df.date.dt.year.unique()
+
+    @lazy
+    def years(cls):
+        import pandas as pd
+        return pd.concat([cls.train_df, cls.test_df]).date.dt.year.unique()
+
     validation_year = 2018
-    
-    countries = train_df.country.unique()
-    stores = train_df.store.unique()
-    products = train_df['product'].unique()
-    
+
+    @lazy
+    def countries(cls):
+        import numpy as np
+        return np.asarray(cls.train_df.country.unique())
+
+    @lazy
+    def stores(cls):
+        import numpy as np
+        return np.asarray(cls.train_df.store.unique())
+
+    @lazy
+    def products(cls):
+        import numpy as np
+        return np.asarray(cls.train_df['product'].unique())
+
     alpha3 = {
         'Finland': 'FIN',
         'Canada': 'CAN',
@@ -25,7 +77,7 @@ class CFG:
         'Singapore': 'SGP',
     } # to get per capita GDP
     fft_filter_width = 8
-    
+
     countries_21 = {
         'Finland': 'FI',
         'Canada': 'CA',
@@ -35,6 +87,6 @@ class CFG:
         'Singapore': 'SG',
     } # to get holidays
     holiday_response_len = 10
-    
+
     sincoscol = ['sin t', 'cos t', 'sin t/2', 'cos t/2']
-    sincoscol2 = ['sin2t', 'cos 2t', *sincoscol]
\ No newline at end of file
+    sincoscol2 = ['sin 2t', 'cos 2t', *sincoscol]
\ No newline at end of file
@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+
+
+def category_codes(values, categories) -> np.ndarray:
+    # integer code per row, -1 for labels outside `categories`
+    if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+        # map the few categories, then gather by the existing codes
+        values = pd.Categorical(values)
+        lookup = np.append(pd.Index(categories).get_indexer(values.categories), -1)
+        return lookup[values.codes].astype(np.int64)
+    return pd.Index(categories).get_indexer(np.asarray(values, dtype=object)).astype(np.int64)
+
+
+def day_codes(dates) -> np.ndarray:
+    # days since epoch, so codes stay comparable between train and test frames
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
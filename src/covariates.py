@@ -0,0 +1,115 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from src.cfg import CFG
+from src.codes import category_codes, day_codes
+
+
+def _log_linear(values: np.ndarray, x: np.ndarray, out_x: np.ndarray) -> np.ndarray:
+    """
+    Resample each row of `values` (observed at `x`, NaN = missing) onto `out_x`.
+    Gaps are interpolated and the ends extrapolated at the edge growth rate,
+    in log space so that the result stays positive.
+    """
+    out = np.full((len(values), len(out_x)), np.nan)
+    for i, row in enumerate(np.log(values)):  # one iteration per key, not per cell
+        ok = np.isfinite(row)
+        if not ok.any():
+            continue
+        xs, ys = x[ok], row[ok]
+        out[i] = np.interp(out_x, xs, ys)
+        if len(xs) > 1:
+            lo_slope = (ys[1] - ys[0]) / (xs[1] - xs[0])
+            hi_slope = (ys[-1] - ys[-2]) / (xs[-1] - xs[-2])
+            out[i] += np.minimum(out_x - xs[0], 0) * lo_slope + np.maximum(out_x - xs[-1], 0) * hi_slope
+    out = np.exp(out)
+
+    # observed cells are copied through exactly
+    pos = np.searchsorted(out_x, x)
+    hit = (pos < len(out_x)) & (out_x[np.minimum(pos, len(out_x) - 1)] == x)
+    observed = np.where(np.isfinite(values[:, hit]), values[:, hit], out[:, pos[hit]])
+    out[:, pos[hit]] = observed
+    return out
+
+
+class CovariateStore:
+    """
+    External covariates keyed by country (`CFG.alpha3` code). Tables are kept
+    as dense key x period arrays so a join is one integer gather per row.
+    `countries` defaults to every configured country in sorted (category)
+    order, so building the store reads no sales data.
+    """
+    def __init__(self, countries=None):
+        self.countries = np.asarray(sorted(CFG.alpha3) if countries is None else countries)
+        self.keys = [CFG.alpha3[c] for c in self.countries]
+        self.yearly = {}  # name -> (first year, values[key, year])
+        self.daily = {}   # name -> (first day, values[key, day])
+
+    def _key_codes(self, country) -> np.ndarray:
+        return category_codes(np.asarray(country), self.countries)
+
+    def _table(self, table: pd.DataFrame) -> pd.DataFrame:
+        # rows may be labelled by country name or alpha3 code
+        table = table.rename(index=CFG.alpha3)
+        return table.reindex(self.keys)
+
+    def add_yearly(self, name: str, table: pd.DataFrame, years=None):
+        """`table`: one row per country, one column per year; `years` widens the stored range."""
+        table = self._table(table)
+        x = table.columns.astype(int).to_numpy()
+        span = np.concatenate([x, np.asarray(years if years is not None else [], dtype=int)])
+        out_years = np.arange(span.min(), span.max() + 1)
+        self.yearly[name] = (out_years[0], _log_linear(table.to_numpy(dtype=float), x, out_years))
+
+    def add_daily(self, name: str, table: pd.DataFrame):
+        """`table`: one row per date, one column per country. Gaps are interpolated linearly."""
+        table = self._table(table.T)
+        x = day_codes(table.columns)
+        out_days = np.arange(x.min(), x.max() + 1)
+        values = table.to_numpy(dtype=float)
+        dense = np.full((len(values), len(out_days)), np.nan)
+        for i, row in enumerate(values):
+            ok = np.isfinite(row)
+            if ok.any():
+                dense[i] = np.interp(out_days, x[ok], row[ok])
+        self.daily[name] = (out_days[0], dense)
+
+    def extend_yearly(self, name: str, years):
+        """Widen the stored range of `name` to cover `years` (extrapolated at the edge growth rate)."""
+        years = np.asarray(years, dtype=int)
+        first, values = self.yearly[name]
+        if years.size and (years.min() < first or years.max() >= first + values.shape[1]):
+            x = np.arange(first, first + values.shape[1])
+            out_years = np.arange(min(years.min(), first), max(years.max() + 1, x[-1] + 1))
+            first, values = self.yearly[name] = (out_years[0], _log_linear(values, x, out_years))
+        return first, values
+
+    def gather_yearly(self, name: str, country, year) -> np.ndarray:
+        year = np.asarray(year, dtype=int)
+        # years outside the stored range: extend the dense table once, then gather
+        first, values = self.extend_yearly(name, [year.min(), year.max()] if year.size else [])
+        return self._gather(values, self._key_codes(country), year - first)
+
+    def gather_daily(self, name: str, country, date) -> np.ndarray:
+        first, values = self.daily[name]
+        # dates beyond the table hold the edge value
+        pos = np.clip(day_codes(date) - first, 0, values.shape[1] - 1)
+        return self._gather(values, self._key_codes(country), pos)
+
+    @staticmethod
+    def _gather(values: np.ndarray, key: np.ndarray, pos: np.ndarray) -> np.ndarray:
+        out = values[np.maximum(key, 0), pos]
+        out[key < 0] = np.nan
+        return out
+
+
+@lru_cache(maxsize=None)
+def covariate_store() -> CovariateStore:
+    # loaded once per process; the GDP rows are the countries in sorted order,
+    # and years beyond its columns are extended on demand by gather_yearly
+    store = CovariateStore()
+    gdp_df = pd.read_csv("data/gdp_per_capita.csv")
+    gdp_df.index = store.countries
+    store.add_yearly('gdp', gdp_df)
+    return store
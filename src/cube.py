@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from src.cfg import CFG
+from src.codes import category_codes, day_codes
+from src.profiling import stage
+
+
+class SalesCube:
+    """
+    Dense `num_sold` array of shape (date, country, store, product) over a
+    contiguous daily calendar; missing sales are NaN. Aggregations are axis
+    reductions instead of long-format groupbys.
+    """
+    axes = ('date', 'country', 'store', 'product')
+
+    def __init__(self, dates: pd.DatetimeIndex, values: np.ndarray, countries=None, stores=None, products=None):
+        self.dates = pd.DatetimeIndex(dates)
+        self.values = values
+        self.labels = {
+            'country': np.asarray(CFG.countries if countries is None else countries),
+            'store': np.asarray(CFG.stores if stores is None else stores),
+            'product': np.asarray(CFG.products if products is None else products),
+        }
+
+    @classmethod
+    @stage()
+    def from_frame(cls, df: pd.DataFrame, countries=None, stores=None, products=None, column: str = 'num_sold'):
+        """
+        Cube of `column` over the labels given (default: CFG's). Rows with a
+        country, store or product outside them are left out; the calendar
+        still spans every date of `df`.
+        """
+        countries = np.asarray(CFG.countries if countries is None else countries)
+        stores = np.asarray(CFG.stores if stores is None else stores)
+        products = np.asarray(CFG.products if products is None else products)
+
+        day = day_codes(df['date'])
+        first = day.min()
+        n_dates = day.max() - first + 1
+        c = category_codes(df['country'], countries)
+        s = category_codes(df['store'], stores)
+        p = category_codes(df['product'], products)
+        ok = (c >= 0) & (s >= 0) & (p >= 0)  # a -1 code would write into the last label's cells
+        values = np.full((n_dates, len(countries), len(stores), len(products)), np.nan)
+        values[day[ok] - first, c[ok], s[ok], p[ok]] = df[column].to_numpy(dtype=float)[ok]
+
+        dates = pd.date_range(pd.Timestamp(first, unit='D'), periods=n_dates, freq='D')
+        return cls(dates, values, countries, stores, products)
+
+    def code(self, axis: str, label) -> int:
+        return int(np.flatnonzero(self.labels[axis] == label)[0])
+
+    def _axis(self, name: str) -> int:
+        return self.axes.index(name)
+
+    def _year_starts(self) -> np.ndarray:
+        years = self.dates.year.to_numpy()
+        return np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+
+    def daily_total(self) -> np.ndarray:
+        return np.nansum(self.values, axis=(1, 2, 3))
+
+    def daily_by(self, axis: str) -> np.ndarray:
+        """(date, label) totals for one category axis."""
+        keep = self._axis(axis)
+        return np.nansum(self.values, axis=tuple(a for a in (1, 2, 3) if a != keep))
+
+    def yearly_by(self, axis: str) -> pd.DataFrame:
+        """Long frame with `date` (year), `axis` and `num_sold` columns, as the EDA plots expect."""
+        starts = self._year_starts()
+        totals = np.add.reduceat(self.daily_by(axis), starts, axis=0)
+        labels = self.labels[axis]
+        years = self.dates.year.to_numpy()[starts]
+        return pd.DataFrame({
+            'date': np.repeat(years, len(labels)),
+            axis: np.tile(labels, len(years)),
+            'num_sold': totals.ravel(),
+        })
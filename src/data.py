@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from src.profiling import span, stage
+
+
+CACHE_DIR = '.cache'
+ARCHIVE = 'playground-series-s5e1.zip'
+CATEGORICAL = ('country', 'store', 'product')
+DATES = ('date',)
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _umask() -> int:
+    # read without changing it where the kernel reports it; os.umask alone would
+    # briefly set it to 0 for every thread
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+def staging_dir(parent: str) -> str:
+    """
+    Private temporary directory in `parent` to fill and then `os.replace` into
+    place, with the permissions of a normally created directory: mkdtemp's
+    0700 would leave caches built by one user (deploy, CI) unreadable to the
+    app or service user.
+    """
+    tmp = tempfile.mkdtemp(dir=parent)
+    os.chmod(tmp, 0o777 & ~_umask())
+    return tmp
+
+
+def _cache_path(path: str, digest: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(path), CACHE_DIR, f'{stem}-{digest}')
+
+
+def parse_csv(path_or_buffer, **kwargs) -> pd.DataFrame:
+    """Typed CSV read: categorical labels and parsed dates."""
+    df = pd.read_csv(path_or_buffer, dtype={c: 'category' for c in CATEGORICAL}, **kwargs)
+    for col in DATES:
+        if col in df.columns:
+            df[col] = pd.DatetimeIndex(df[col])
+    return df
+
+
+def _typed_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    for col in DATES:
+        if col in chunk.columns:
+            chunk[col] = pd.to_datetime(chunk[col], format='%Y-%m-%d')
+    return chunk
+
+
+def iter_zip_csv(archive: str, member: str, chunksize: int = 100_000):
+    """Stream typed chunks of `member` straight out of `archive`, without extracting it."""
+    with zipfile.ZipFile(archive) as z, z.open(member) as f:
+        dtype = {c: 'category' for c in CATEGORICAL}
+        for chunk in pd.read_csv(f, dtype=dtype, chunksize=chunksize):
+            yield _typed_chunk(chunk)
+
+
+def iter_csv(path: str, chunksize: int = 100_000):
+    """Typed chunks of `path`, or of the same member of the competition archive when it is not extracted."""
+    if os.path.exists(path):
+        dtype = {c: 'category' for c in CATEGORICAL}
+        for chunk in pd.read_csv(path, dtype=dtype, chunksize=chunksize):
+            yield _typed_chunk(chunk)
+    else:
+        yield from iter_zip_csv(os.path.join(os.path.dirname(path), ARCHIVE), os.path.basename(path), chunksize)
+
+
+def read_zip_csv(archive: str, member: str, chunksize: int = 100_000) -> pd.DataFrame:
+    chunks = list(iter_zip_csv(archive, member, chunksize))
+    for col in CATEGORICAL:
+        if chunks and col in chunks[0].columns:
+            # chunks may have seen different labels: give them all the union first, so
+            # concat keeps the column categorical instead of falling back to object
+            categories = union_categoricals([c[col] for c in chunks], sort_categories=True).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write_chunks(chunks, target: str) -> int:
+    """Sink for streamed frames: each chunk becomes a column cache `target/part-NNNNN`; returns the row count."""
+    os.makedirs(target, exist_ok=True)
+    rows = 0
+    for n, chunk in enumerate(chunks):
+        write_cache(chunk, os.path.join(target, f'part-{n:05d}'))
+        rows += len(chunk)
+    return rows
+
+
+def read_chunks(target: str):
+    """Stream the parts written by `write_chunks` back, memory-mapped, in order."""
+    for name in sorted(os.listdir(target)):
+        if name.startswith('part-'):
+            yield read_cache(os.path.join(target, name))
+
+
+def write_cache(df: pd.DataFrame, target: str):
+    """Write one .npy file per column (categoricals as codes) plus meta.json, atomically."""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = staging_dir(os.path.dirname(target))
+    meta = {'columns': []}
+    for n, col in enumerate(df.columns):
+        s = df[col]
+        entry = {'name': col, 'file': f'{n}.npy'}
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            entry['categories'] = s.cat.categories.astype(str).tolist()
+            values = s.cat.codes.to_numpy()
+        else:
+            values = s.to_numpy()
+        np.save(os.path.join(tmp, entry['file']), values, allow_pickle=False)
+        meta['columns'].append(entry)
+    with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    try:
+        os.replace(tmp, target)
+    except OSError:  # another process won the race
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def read_cache(target: str) -> pd.DataFrame:
+    """Map the cached columns back in; every column (categorical codes too) stays backed by the memmap."""
+    with open(os.path.join(target, 'meta.json')) as f:
+        meta = json.load(f)
+    columns = {}
+    for entry in meta['columns']:
+        values = np.load(os.path.join(target, entry['file']), mmap_mode='r', allow_pickle=False)
+        if 'categories' in entry:
+            values = pd.Categorical.from_codes(values, categories=entry['categories'])
+        columns[entry['name']] = values
+    # copy=False: without it the DataFrame constructor copies every memmap into memory
+    return pd.DataFrame(columns, copy=False)
+
+
+def _drop_stale(path: str, keep: str):
+    cache_dir = os.path.join(os.path.dirname(path), CACHE_DIR)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for name in os.listdir(cache_dir):
+        old = os.path.join(cache_dir, name)
+        if name.rsplit('-', 1)[0] == stem and old != keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def _source(path: str):
+    # the extracted CSV if present, else the same member of the competition archive
+    if os.path.exists(path):
+        return file_hash(path), lambda: parse_csv(path)
+    archive = os.path.join(os.path.dirname(path), ARCHIVE)
+    member = os.path.basename(path)
+    with zipfile.ZipFile(archive) as z:
+        info = z.getinfo(member)
+    return f'zip{info.CRC:08x}', lambda: read_zip_csv(archive, member)
+
+
+def data_version(path: str) -> str:
+    """Content key of `path` (or of its archive member), used to version derived artifacts."""
+    return _source(path)[0]
+
+
+def data_stamp(path: str) -> str:
+    """Size and mtime of `path` (or of the archive it is read from): a cheap check for whether `data_version` can have changed."""
+    if not os.path.exists(path):
+        path = os.path.join(os.path.dirname(path), ARCHIVE)
+    st = os.stat(path)
+    return f'{st.st_size}-{st.st_mtime_ns}'
+
+
+@stage('load_csv')
+def load_csv(path: str) -> pd.DataFrame:
+    """
+    Load `path` through a binary column cache stored in `<dir>/.cache/`.
+    The cache is keyed on the content hash of the CSV (or the member CRC when
+    it is read from the archive), so new data invalidates it; an unwritable
+    data directory falls back to parsing.
+    """
+    digest, parse = _source(path)
+    target = _cache_path(path, digest)
+    if os.path.isdir(target):
+        return read_cache(target)
+
+    with span(f'parse {os.path.basename(path)}'):
+        df = parse()
+    try:
+        write_cache(df, target)
+        _drop_stale(path, target)
+    except OSError:
+        return df
+    return read_cache(target)
+
+
+def load_data(train_path: str = './data/train.csv', test_path: str = './data/test.csv') -> pd.DataFrame:
+    train, test = load_csv(train_path), load_csv(test_path)
+    train['test'], test['test'] = 0, 1
+    df = pd.concat([train, test])
+    return df
+
+
+def iter_data(train_path: str = './data/train.csv', test_path: str = './data/test.csv', chunksize: int = 100_000):
+    """Chunked `load_data`: train chunks then test chunks, each with the 'test' flag, never all in memory."""
+    for path, flag in ((train_path, 0), (test_path, 1)):
+        for chunk in iter_csv(path, chunksize):
+            chunk['test'] = flag
+            yield chunk
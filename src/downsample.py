@@ -0,0 +1,56 @@
+import numpy as np
+
+
+def _as_float(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x)
+    return x.astype('datetime64[ns]').astype(np.int64).astype(float) if x.dtype.kind == 'M' else x.astype(float)
+
+
+def lttb(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points of (x, y) that
+    keep the visual shape of the line. First and last points are always kept.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    xf, yf = _as_float(x), np.asarray(y, dtype=float)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = xf[nlo:nhi].mean(), yf[nlo:nhi].mean()
+        area = np.abs((xf[a] - avg_x) * (yf[lo:hi] - yf[a]) - (xf[a] - xf[lo:hi]) * (avg_y - yf[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+class MultiResolution:
+    """
+    Pre-built LTTB levels of one series, each `factor` times coarser than the
+    previous. `window` returns the finest level that fits the point budget
+    for the requested x range, so a zoomed-in window comes back at full
+    resolution while the full history stays within the budget.
+    """
+    def __init__(self, x, y, factor: int = 4, min_points: int = 500):
+        x, y = np.asarray(x), np.asarray(y, dtype=float)
+        self.levels = [(x, y)]
+        while len(x) > min_points * factor:
+            idx = lttb(x, y, len(x) // factor)
+            x, y = x[idx], y[idx]
+            self.levels.append((x, y))
+
+    def window(self, start=None, end=None, budget: int = 1000):
+        for x, y in self.levels:
+            lo = 0 if start is None else np.searchsorted(x, start, side='left')
+            hi = len(x) if end is None else np.searchsorted(x, end, side='right')
+            if hi - lo <= budget:
+                return x[lo:hi], y[lo:hi]
+        idx = lttb(x[lo:hi], y[lo:hi], budget)
+        return x[lo:hi][idx], y[lo:hi][idx]
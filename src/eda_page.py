@@ -1,66 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import streamlit as st
 from src.helper import EDA
 
+# figure builders only read EDA's read-only arrays, so one pool serves every session
+POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='eda-figures')
+
+
+def _section(title, key, lazy, opened):
+    # lazy mode: a section is a toggle and its body (and figures) only exist once it is switched on
+    if not lazy:
+        return st.expander(title, expanded=True)
+    if st.toggle(title, value=opened, key=f"section_{key}"):
+        return st.container(border=True)
+    return None
+
+
+def _chart(jobs, build, *args):
+    # reserve the chart's place now and start building its figure in the pool
+    jobs[POOL.submit(build, *args)] = st.empty()
+
+
 def eda_page():
     st.title("🔍 Exploratory Data Analysis")
     st.markdown(
         """
-        In this section, we dive deep into the **sticker sales data** to uncover patterns and trends.  
+        In this section, we dive deep into the **sticker sales data** to uncover patterns and trends.
         Let's explore how sales vary across **time**, **countries**, **stores**, and **products**.
         """
     )
-    
+    lazy = st.sidebar.toggle("Build EDA sections on demand", value=True)
+
     eda = EDA()
-    
+    eda.range_filters()
+    jobs = {}
+
     # Sales Over Time and Country Analysis Group
-    with st.expander("📊 Time and Geographic Analysis", expanded=True):
-        st.subheader("1. Sales Trends Over Time 📅")
-        st.markdown(
-            """
-            **Objective**: Analyze the sinusoidal patterns in sales over time.  
-            - The number of stickers sold shows clear seasonal trends.  
-            - Peaks and troughs correspond to festive seasons and low-sales periods.  
-            """
-        )
-        eda.plot_numSold_date()
-            
-    
-    # Store and Product Analysis Group
-    with st.expander("🏪 Store and Product Analysis", expanded=True):
-        st.subheader("2. Country-wise Sales Trends 🌍")
-        st.markdown(
-            """
-            **Objective**: Visualize how sticker sales differ across countries.  
-            - **Top-performing countries** have higher sales during certain periods.  
-            - Use this insight to adjust marketing strategies for underperforming regions.  
-            """
-        )
-        eda.plot_sellTrend_country()
-        
-        col3, col4 = st.columns(2)
-        with col3:
-            st.subheader("3. Store-wise Sticker Sales 🏬")
+    section = _section("📊 Time and Geographic Analysis", "time", lazy, opened=True)
+    if section is not None:
+        with section:
+            st.subheader("1. Sales Trends Over Time 📅")
             st.markdown(
                 """
-                **Objective**: Evaluate how different store types influence sticker sales.  
-                - Certain store categories sell more stickers due to higher foot traffic.  
+                **Objective**: Analyze the sinusoidal patterns in sales over time.
+                - The number of stickers sold shows clear seasonal trends.
+                - Peaks and troughs correspond to festive seasons and low-sales periods.
                 """
             )
-            eda.plot_sellTrend_store()
-            
-        with col4:
-            st.subheader("4. Product-wise Sticker Sales 🎨")
+            _chart(jobs, eda.numSold_date_figure, *eda._date_range())
+
+
+    # Store and Product Analysis Group
+    section = _section("🏪 Store and Product Analysis", "store", lazy, opened=False)
+    if section is not None:
+        with section:
+            st.subheader("2. Country-wise Sales Trends 🌍")
             st.markdown(
                 """
-                **Objective**: Analyze which products are the best sellers.  
-                - **Top sticker types** can be targeted for promotions.  
-                - Seasonal demand for specific stickers is evident from sales spikes.  
+                **Objective**: Visualize how sticker sales differ across countries.
+                - **Top-performing countries** have higher sales during certain periods.
+                - Use this insight to adjust marketing strategies for underperforming regions.
                 """
             )
-            eda.plot_sellTrend_product()
-       
-    with st.expander("📈 Sinusoidal Sales Analysis", expanded=True): 
-        eda.plot_sinusoidal_sells()
-    
-    with st.expander("📊 Fourier Analysis", expanded=True):
-        eda.fourier_analysis()
\ No newline at end of file
+            _chart(jobs, eda.sellTrend_figure, 'country')
+
+            col3, col4 = st.columns(2)
+            with col3:
+                st.subheader("3. Store-wise Sticker Sales 🏬")
+                st.markdown(
+                    """
+                    **Objective**: Evaluate how different store types influence sticker sales.
+                    - Certain store categories sell more stickers due to higher foot traffic.
+                    """
+                )
+                _chart(jobs, eda.sellTrend_figure, 'store')
+
+            with col4:
+                st.subheader("4. Product-wise Sticker Sales 🎨")
+                st.markdown(
+                    """
+                    **Objective**: Analyze which products are the best sellers.
+                    - **Top sticker types** can be targeted for promotions.
+                    - Seasonal demand for specific stickers is evident from sales spikes.
+                    """
+                )
+                _chart(jobs, eda.sellTrend_figure, 'product')
+
+    for title, key, build in (
+        ("📈 Sinusoidal Sales Analysis", "sincos", eda.sinusoidal_figure),
+        ("📊 Fourier Analysis", "fourier", eda.fourier_figure),
+    ):
+        section = _section(title, key, lazy, opened=False)
+        if section is None:
+            continue
+        with section:
+            picked = eda._pick_slice(key)
+            if all(picked):
+                _chart(jobs, build, picked)
+            else:
+                st.info("Select at least one country, store and product.")
+
+    # draw each figure as soon as it is ready, in whatever order they finish
+    for future in as_completed(jobs):
+        jobs[future].plotly_chart(future.result(), use_container_width=True)
@@ -1,62 +1,299 @@
 import  numpy as np
 import pandas as pd
 from src.cfg import CFG
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from src.codes import category_codes, day_codes
+from src.covariates import covariate_store
+from src.holiday import HolidayCalendar, holiday_calendar, holiday_response
+from src.cube import SalesCube
+from src.fft_filter import smooth_cube
+from src.profiling import span, stage
+
+
+# name -> function(pass) returning the column; names starting with '_' are
+# intermediates that are shared between features but never emitted
+FEATURES = {}
+
+# harmonic -> (numpy function, multiple of pi, phase intermediate)
+HARMONICS = {
+    'sin 4t': (np.sin, 8, '_partofyear'),
+    'cos 4t': (np.cos, 8, '_partofyear'),
+    'sin 3t': (np.sin, 6, '_partofyear'),
+    'cos 3t': (np.cos, 6, '_partofyear'),
+    'sin 2t': (np.sin, 4, '_partofyear'),
+    'cos 2t': (np.cos, 4, '_partofyear'),
+    'sin t': (np.sin, 2, '_partofyear'),
+    'cos t': (np.cos, 2, '_partofyear'), # partofyear takes half a year to complete
+    'sin t/2': (np.sin, 1, '_partof2year'), # partof2year takes a year to complete
+    'cos t/2': (np.cos, 1, '_partof2year'),
+}
+
+
+def feature(name):
+    def register(fn):
+        FEATURES[name] = fn
+        return fn
+    return register
+
+
+class _Pass:
+    """One feature-building pass over a frame; every intermediate is computed at most once."""
+    def __init__(self, df: pd.DataFrame, dtype, values=None):
+        self.df = df
+        self.dtype = dtype
+        self.values = {} if values is None else dict(values)  # precomputed entries win
+
+    def __getitem__(self, name):
+        if name not in self.values:
+            if name in FEATURES:
+                with span(f'feature {name}', rows=len(self.df)):
+                    self.values[name] = FEATURES[name](self)
+            elif name.startswith('_angle '):
+                _, k, base = name.split(' ', 2)
+                self.values[name] = self[base].astype(self.dtype) * self.dtype(int(k) * np.pi)
+            else:
+                self.values[name] = self.df[name].to_numpy()
+        return self.values[name]
+
+
+@feature('_dates')
+def _dates(p):
+    return pd.DatetimeIndex(p.df['date'])
+
+@feature('year')
+def _year(p):
+    return p['_dates'].year.to_numpy()
+
+@feature('month')
+def _month(p):
+    return p['_dates'].month.to_numpy()
+
+@feature('weekday')
+def _weekday(p):
+    return p['_dates'].weekday.to_numpy()
+
+@feature('dayofyear')
+def _dayofyear(p):
+    return p['_dates'].dayofyear.to_numpy()
+
+@feature('daynum')
+def _daynum(p):
+    dates = p['_dates']
+    return ((dates - dates[0]) // pd.Timedelta(days=1)).to_numpy()
+
+@feature('weeknum')
+def _weeknum(p):
+    return p['daynum'] // 7
+
+@feature('_dayisinyear')
+def _dayisinyear(p):
+    # calendar length of the year, so any subset of rows (e.g. one request) gets the same phase
+    return 365 + p['_dates'].is_leap_year.astype(int)
+
+@feature('_partofyear')
+def _partofyear(p):
+    return (p['dayofyear'] - 1) / p['_dayisinyear'] # sinusoidal
+
+@feature('_partof2year')
+def _partof2year(p):
+    return p['dayofyear'] + p['year'] % 2 # sinusoidal
+
+for _name, (_fn, _k, _base) in HARMONICS.items():
+    FEATURES[_name] = lambda p, fn=_fn, k=_k, base=_base: fn(p[f'_angle {k} {base}'])
+
+@feature('gdp_factor')
+def _gdp_factor(p):
+    return covariate_store().gather_yearly('gdp', p['country'], p['year'])
+
+@feature('holiday')
+def _holiday(p):
+    calendar = holiday_calendar()
+    return calendar.gather(calendar.indicator, p['country'], p['date']).astype(np.int8)
+
+@feature('holiday_response')
+def _holiday_response(p):
+    return holiday_calendar().gather(holiday_response(), p['country'], p['date']).astype(np.int8)
+
+@feature('num_sold_lowpass')
+def _num_sold_lowpass(p):
+    # target with the band above CFG.fft_filter_width cycles/year removed; NaN outside the labelled dates
+    labelled = p.df[p.df['num_sold'].notna()]
+    cube = SalesCube.from_frame(labelled)
+    smooth = smooth_cube(cube)
+    pos = day_codes(p['date']) - day_codes(cube.dates[:1])[0]
+    code = [category_codes(p[axis], cube.labels[axis]) for axis in ('country', 'store', 'product')]
+    ok = (pos >= 0) & (pos < len(smooth)) & (np.min(code, axis=0) >= 0)
+    out = np.full(len(pos), np.nan)
+    out[ok] = smooth[pos[ok], code[0][ok], code[1][ok], code[2][ok]]
+    return out
+
+def _store_totals(df: pd.DataFrame):
+    # per-store sum and count of sales outside Kenya / Canada; additive over row chunks
+    if 'num_sold' not in df:
+        return pd.Series(dtype=float), pd.Series(dtype=int)
+    keep = ~df['country'].isin(['Kenya', 'Canada']).to_numpy() & df['num_sold'].notna().to_numpy()
+    sold = df[keep].groupby(df['store'][keep].astype(str)).num_sold
+    return sold.sum(), sold.count()
+
+@feature('store_factor')
+def _store_factor(p):
+    store = p.df['store']
+    keep = ~p.df['country'].isin(['Kenya', 'Canada']).to_numpy() # keya and canada contains NaN values
+    store_df = p.df[keep].groupby(by='store').num_sold.mean()
+    return store.map(store_df).to_numpy()
 
 
 class Feategg:
-    def __init__(self, df: pd.DataFrame):
-        self.df = self.feature_eng(df)
-        self.df = self._add_gdp(self.df)
+    # default output; 'holiday', 'holiday_response' and 'num_sold_lowpass' are available on request
+    columns = ['year', 'month', 'weekday', 'dayofyear', 'daynum', 'weeknum', *HARMONICS, 'gdp_factor', 'store_factor']
+
+    def __init__(self, df: pd.DataFrame, features=None, dtype=np.float64):
+        self.df = self.feature_eng(df, features, dtype)
         self.train_df = self.df[self.df['test'] == 0]
         self.test_df = self.df[self.df['test'] == 1]
-   
-
-    def feature_eng(self, df: pd.DataFrame):
-        # abt = pd.concat([train_df, test_df])
-        abt = df.copy()
-        abt['year'] = abt.date.dt.year
-        abt['month'] = abt.date.dt.month
-        abt['weekday'] = abt.date.dt.weekday
-        abt['dayofyear'] = abt.date.dt.dayofyear
-        abt['daynum'] = (abt.date - abt.date.iloc[0]).dt.days
-        abt['weeknum'] = abt.daynum // 7
-
-
-        dayisinyear = (abt.groupby('year').id.count() / len(CFG.countries) / len(CFG.stores) / len(CFG.products)).rename('dayisinyear').astype(int).to_frame()
-        abt = abt.merge(dayisinyear, on='year', how='left')
-        abt['partofyear'] = (abt['dayofyear'] - 1) / abt['dayisinyear'] # sinusoidal
-        abt['partof2year'] = abt['dayofyear'] + abt['year'] % 2 # sinusoidal
-        abt['sin 4t'] = np.sin(8 * np.pi * abt['partofyear'])  
-        abt['cos 4t'] = np.cos(8 * np.pi * abt['partofyear'])
-        abt['sin 3t'] = np.sin(6 * np.pi * abt['partofyear'])
-        abt['cos 3t'] = np.cos(6 * np.pi * abt['partofyear'])
-        abt['sin 2t'] = np.sin(4 * np.pi * abt['partofyear'])
-        abt['cos 2t'] = np.cos(4 * np.pi * abt['partofyear'])
-        abt['sin t'] = np.sin(2 * np.pi * abt['partofyear'])
-        abt['cos t'] = np.cos(2 * np.pi * abt['partofyear']) # partofyear takes half a year to complete
-        abt['sin t/2'] = np.sin(np.pi * abt['partof2year']) # partof2year takes a year to complete
-        abt['cos t/2'] = np.cos(np.pi * abt['partof2year'])
-        abt.drop(['partofyear', 'partof2year', 'dayisinyear'], axis=1, inplace=True)
-
-        abt = self._add_gdp(abt)
-
-        abt_no_ken_can = abt[~abt.country.isin(['Kenya', 'Canada'])] # keya and canada contains NaN values
-        store_df = abt_no_ken_can.groupby(by='store').num_sold.mean().rename('store_factor').to_frame()
-        abt = abt.drop('store_factor', axis=1, errors='ignore').join(store_df, on='store', how='left')
-
-        return abt
-
-    def _add_gdp(self, df):
-        abt = df.copy()
-        gdp_df = pd.read_csv("data/gdp_per_capita.csv")
-        gdp_df.index = CFG.countries
-        gdp_df.columns = CFG.years
-
-        abt['gdp_factor'] = None
-        for year in CFG.years:
-            for country in CFG.countries:
-                abt.loc[(abt.year == year) & (abt.country == country), 'gdp_factor'] = gdp_df.loc[country, year]
-        
-        return abt
\ No newline at end of file
+
+
+    @classmethod
+    @stage('Feategg.feature_eng')
+    def feature_eng(cls, df: pd.DataFrame, features=None, dtype=np.float64):
+        """
+        Add `features` (default: all of `Feategg.columns`) to `df` in a single
+        pass. Float features are stored as `dtype`, e.g. np.float32 to halve memory.
+        """
+        features = cls._check(features)
+        df = df.reset_index(drop=True)
+        return cls._emit(_Pass(df, dtype), features)
+
+    @classmethod
+    def stream(cls, chunks, features=None, dtype=np.float64):
+        """
+        Out-of-core `feature_eng`. `chunks` is a callable returning a fresh
+        iterator of date-ordered frames, e.g. `lambda: iter_data(chunksize=...)`.
+        A first pass collects the global statistics (store_factor means, the
+        first date for daynum, the years and countries the GDP and holiday
+        tables must cover); the second yields one feature frame per chunk,
+        to be consumed by a sink such as `write_chunks` or a model's
+        `partial_fit`. Only one chunk is held in memory at a time, and CFG's
+        data attributes (which load the whole CSVs) are never read.
+        """
+        features = cls._check(features)
+        if 'num_sold_lowpass' in features:
+            raise ValueError("num_sold_lowpass filters whole series and is not available in streaming mode")
+
+        store_sum, store_count, first = 0.0, 0, None
+        years, countries = set(), set()
+        for chunk in chunks():
+            s, n = _store_totals(chunk)
+            store_sum, store_count = s.add(store_sum, fill_value=0), n.add(store_count, fill_value=0)
+            start = chunk['date'].min()
+            first = start if first is None else min(first, start)
+            years.update(pd.DatetimeIndex(chunk['date']).year.unique().tolist())
+            countries.update(chunk['country'].astype(str).unique().tolist())
+        store_mean = store_sum / store_count
+
+        # covariate tables sized from what pass 1 saw
+        covariate_store().extend_yearly('gdp', sorted(years))
+        holidays = [f for f in ('holiday', 'holiday_response') if f in features]
+        if holidays:
+            calendar = HolidayCalendar(sorted(years), sorted(c for c in countries if c in CFG.countries_21))
+            tables = {'holiday': calendar.indicator, 'holiday_response': calendar.response() > 0}
+
+        for chunk in chunks():
+            chunk = chunk.reset_index(drop=True)
+            dates = pd.DatetimeIndex(chunk['date'])
+            values = {
+                '_dates': dates,
+                'daynum': ((dates - first) // pd.Timedelta(days=1)).to_numpy(),
+                'store_factor': chunk['store'].astype(str).map(store_mean).to_numpy(dtype=float),
+            }
+            for name in holidays:
+                values[name] = calendar.gather(tables[name], chunk['country'], chunk['date']).astype(np.int8)
+            yield cls._emit(_Pass(chunk, dtype, values), features)
+
+    @classmethod
+    def _check(cls, features):
+        features = cls.columns if features is None else list(features)
+        unknown = [f for f in features if f not in FEATURES or f.startswith('_')]
+        if unknown:
+            raise KeyError(f"unknown features: {unknown}")
+        return features
+
+    @staticmethod
+    def _emit(p: _Pass, features) -> pd.DataFrame:
+        new = {}
+        for name in features:
+            values = p[name]
+            new[name] = values.astype(p.dtype, copy=False) if values.dtype.kind == 'f' else values
+
+        keep = p.df.drop(columns=[c for c in features if c in p.df.columns])
+        return pd.concat([keep, pd.DataFrame(new, index=p.df.index)], axis=1)
+
+
+class OnlineFeategg(Feategg):
+    """
+    Feategg over a frame that grows by whole days. `append` builds features for
+    the new rows only: daynum/weeknum count from a fixed `anchor` date instead
+    of the first row, and store_factor comes from running per-store sums, which
+    are gathered into the full frame when it is next read.
+    """
+    def __init__(self, df: pd.DataFrame, features=None, dtype=np.float64, anchor=None):
+        self.features = self._check(features)
+        self.dtype = dtype
+        self.anchor = None if anchor is None else pd.Timestamp(anchor)
+        # stores of the seed frame; stores first seen in a later batch are added by `append`
+        self.store_sum = pd.Series(0.0, index=pd.Index(df['store'].astype(str).unique()))
+        self.store_count = pd.Series(0, index=self.store_sum.index)
+        self.parts = []
+        self._df = None
+        self.append(df)
+
+    def append(self, rows: pd.DataFrame):
+        rows = rows.reset_index(drop=True)
+        dates = pd.DatetimeIndex(rows['date'])
+        if self.anchor is None:
+            self.anchor = dates[0]
+
+        sold_sum, sold_count = _store_totals(rows)
+        self.store_sum = self.store_sum.add(sold_sum, fill_value=0)
+        self.store_count = self.store_count.add(sold_count, fill_value=0)
+
+        p = _Pass(rows, self.dtype, {
+            '_dates': dates,
+            'daynum': ((dates - self.anchor) // pd.Timedelta(days=1)).to_numpy(),
+            'store_factor': self._store_factor(rows['store']),
+        })
+        self.parts.append(self._emit(p, self.features))
+        self._df = None
+        return self
+
+    def reanchor(self, anchor):
+        """Count daynum / weeknum from `anchor` instead, in one vectorized pass over the appended rows."""
+        self.anchor = pd.Timestamp(anchor)
+        for part in self.parts:
+            daynum = ((pd.DatetimeIndex(part['date']) - self.anchor) // pd.Timedelta(days=1)).to_numpy()
+            if 'daynum' in part:
+                part['daynum'] = daynum
+            if 'weeknum' in part:
+                part['weeknum'] = daynum // 7
+        self._df = None
+        return self
+
+    def _store_factor(self, store: pd.Series) -> np.ndarray:
+        return store.astype(str).map(self.store_sum / self.store_count).to_numpy(dtype=float)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None:
+            if len(self.parts) > 1:
+                self.parts = [pd.concat(self.parts, ignore_index=True)]
+            self._df = self.parts[0]
+            if 'store_factor' in self._df:
+                self._df['store_factor'] = self._store_factor(self._df['store']).astype(self.dtype, copy=False)
+        return self._df
+
+    @property
+    def train_df(self) -> pd.DataFrame:
+        return self.df[self.df['test'] == 0]
+
+    @property
+    def test_df(self) -> pd.DataFrame:
+        return self.df[self.df['test'] == 1]
@@ -0,0 +1,102 @@
+import numpy as np
+from src.cfg import CFG
+
+
+DAYS_PER_YEAR = 365.25
+
+
+def fill_nan(values: np.ndarray) -> np.ndarray:
+    # missing days get their series mean (0 for an all-missing series)
+    finite = np.isfinite(values)
+    count = finite.sum(axis=0)
+    mean = np.where(finite, values, 0).sum(axis=0) / np.maximum(count, 1)
+    return np.where(finite, values, mean)
+
+
+def lowpass(values: np.ndarray, width: float = None) -> np.ndarray:
+    """
+    Keep the band below `width` cycles per year (default `CFG.fft_filter_width`)
+    of every column of `values` (date, series) with one rfft/irfft over the
+    2-D array. A per-series linear trend is removed first and added back, so
+    the implicit periodic extension does not ring at the ends.
+    """
+    width = CFG.fft_filter_width if width is None else width
+    values = np.asarray(values, dtype=float)
+    x = fill_nan(values)
+    n = len(x)
+
+    t = np.column_stack([np.ones(n), np.arange(n)])
+    trend = t @ np.linalg.lstsq(t, x, rcond=None)[0]
+
+    spectrum = np.fft.rfft(x - trend, axis=0)
+    freq = np.fft.rfftfreq(n) * DAYS_PER_YEAR  # cycles per year
+    spectrum[freq > width] = 0
+    out = np.fft.irfft(spectrum, n=n, axis=0) + trend
+    out[:, ~np.isfinite(values).any(axis=0)] = np.nan  # nothing to smooth
+    return out
+
+
+def fir_lowpass(width: float = None, taps: int = 731) -> np.ndarray:
+    """Hamming-windowed sinc with its cutoff at `width` cycles per year; odd length, unit gain."""
+    width = CFG.fft_filter_width if width is None else width
+    cutoff = width / DAYS_PER_YEAR  # cycles per day
+    k = np.arange(taps) - (taps - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * k) * np.hamming(taps)
+    return h / h.sum()
+
+
+def overlap_add(blocks, width: float = None, taps: int = 731):
+    """
+    Streaming low-pass for histories too long to hold at once. `blocks` yields
+    (days, series) arrays in date order; filtered blocks of the same sizes are
+    yielded back, aligned with the input (zero phase), each block convolved
+    with the FIR through one batched rfft/irfft. NaN days repeat the last seen
+    value of their series.
+    """
+    h = fir_lowpass(width, taps)
+    half = (taps - 1) // 2
+    tail = None
+    last = None
+    pending = []   # output samples waiting to be handed back
+    sizes = []     # sizes of the input blocks not yet returned
+    skip = half    # leading samples of the full convolution that precede day 0
+
+    for block in blocks:
+        x = np.array(block, dtype=float, ndmin=2)
+        if last is None:
+            last = np.nan_to_num(fill_nan(x)[0])
+        # forward-fill NaNs with a carry from the previous block
+        idx = np.where(np.isfinite(x), np.arange(len(x))[:, None], -1)
+        idx = np.maximum.accumulate(idx, axis=0)
+        x = np.where(idx >= 0, x[np.maximum(idx, 0), np.arange(x.shape[1])], last)
+        last = x[-1]
+
+        size = len(x) + taps - 1
+        nfft = 1 << (size - 1).bit_length()
+        y = np.fft.irfft(np.fft.rfft(x, nfft, axis=0) * np.fft.rfft(h, nfft)[:, None], nfft, axis=0)[:size]
+        if tail is not None:
+            y[:taps - 1] += tail
+        tail = y[len(x):]
+        ready = y[:len(x)]
+
+        drop = min(skip, len(ready))
+        skip -= drop
+        pending.append(ready[drop:])
+        sizes.append(len(x))
+        out = np.concatenate(pending)
+        while sizes and len(out) >= sizes[0]:
+            yield out[:sizes[0]]
+            out = out[sizes.pop(0):]
+        pending = [out]
+
+    if tail is not None:
+        out = np.concatenate(pending + [tail[skip:half]])
+        for size in sizes:
+            yield out[:size]
+            out = out[size:]
+
+
+def smooth_cube(cube, width: float = None) -> np.ndarray:
+    """Low-pass every country x store x product series of a SalesCube at once; same shape as `cube.values`."""
+    values = cube.values.reshape(len(cube.values), -1)
+    return lowpass(values, width).reshape(cube.values.shape)
@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+from src.cfg import CFG
+from src.codes import category_codes, day_codes
+from src.feategg import HARMONICS
+from src.profiling import stage
+
+
+def group_median(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """NaN-skipping median of `values` per integer code, via one lexsort."""
+    ok = np.isfinite(values) & (codes >= 0)
+    codes, values = codes[ok], values[ok]
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    lo = starts + (counts - 1) // 2
+    hi = starts + counts // 2
+
+    out = np.full(n_groups, np.nan)
+    has = counts > 0
+    out[has] = (values[lo[has]] + values[hi[has]]) / 2
+    return out
+
+
+def ridge_stats(x: np.ndarray, y: np.ndarray, mask: np.ndarray):
+    """
+    Normal-equation sums for ridge fits of every column of `y` (n, m) on the
+    shared design `x` (n, k) plus an intercept; `mask` (n, m) selects the rows
+    used by each column. The sums are additive over rows.
+    """
+    xa = np.column_stack([np.ones(len(x)), x])
+    w = mask.astype(float)
+    gram = np.einsum('nm,nk,nl->mkl', w, xa, xa)
+    rhs = np.einsum('nm,nk->mk', w * np.where(mask, y, 0.0), xa)
+    return gram, rhs
+
+
+def solve_ridge(gram: np.ndarray, rhs: np.ndarray, alpha: float):
+    # the intercept is not penalised, which matches sklearn's Ridge(fit_intercept=True)
+    penalty = alpha * np.eye(gram.shape[-1])
+    penalty[0, 0] = 0.0
+    beta = np.linalg.solve(gram + penalty, rhs[..., None])[..., 0]
+    return beta[:, 0], beta[:, 1:]
+
+
+def batched_ridge(x: np.ndarray, y: np.ndarray, mask: np.ndarray, alpha: float):
+    """Ridge fits of every column of `y` on the shared design `x`; see `ridge_stats`."""
+    return solve_ridge(*ridge_stats(x, y, mask), alpha)
+
+
+def _take(values: np.ndarray, code: np.ndarray) -> np.ndarray:
+    # values[code], NaN where code is -1 (indexing with it would return the last label's value)
+    return np.where(code >= 0, values[np.maximum(code, 0)], np.nan)
+
+
+class FactorForecaster:
+    """
+    Multiplicative factor model from the Results page:
+
+        prediction = constant * gdp * product * store * weekday * sincos * country
+
+    Every factor is estimated with bincount / einsum reductions over the
+    integer codes of date, country, store and product.
+    """
+
+    def __init__(
+        self,
+        product_basis=CFG.sincoscol,
+        sincos_basis=HARMONICS,
+        alpha: float = 0.1,
+        const_scale: float = 1.0,
+        excluded_countries=('Kenya', 'Canada'),  # contain NaN values
+        reference_product: str = 'Kaggle',
+        countries=None,
+        stores=None,
+        products=None,
+    ):
+        self.product_basis = list(product_basis)
+        self.sincos_basis = list(sincos_basis)
+        self.alpha = alpha
+        self.const_scale = const_scale
+        self.excluded_countries = list(excluded_countries)
+        self.reference_product = reference_product
+
+        self.countries = np.asarray(CFG.countries if countries is None else countries)
+        self.stores = np.asarray(CFG.stores if stores is None else stores)
+        self.products = np.asarray(CFG.products if products is None else products)
+
+    @property
+    def features(self) -> list:
+        """Feategg columns that `fit` / `predict` read."""
+        return list(dict.fromkeys([*self.product_basis, *self.sincos_basis, 'gdp_factor']))
+
+    def _codes(self, df: pd.DataFrame, strict: bool = False):
+        # -1 marks a label the model has no factor for; `strict` raises on any
+        codes = (
+            category_codes(df['country'], self.countries),
+            category_codes(df['store'], self.stores),
+            category_codes(df['product'], self.products),
+        )
+        if strict:
+            unknown = {
+                axis: sorted(set(np.asarray(df[axis], dtype=object)[code < 0]))
+                for axis, code in zip(('country', 'store', 'product'), codes) if (code < 0).any()
+            }
+            if unknown:
+                raise ValueError(f"labels outside the model's categories: {unknown}")
+        return codes
+
+    @stage()
+    def fit(self, df: pd.DataFrame):
+        """Fit on a Feategg frame (e.g. `Feategg.train_df`); NaN targets are skipped."""
+        n_c, n_s, n_p = len(self.countries), len(self.stores), len(self.products)
+        k_p, k_s = len(self.product_basis) + 1, len(self.sincos_basis) + 1
+
+        # additive sufficient statistics, so `partial_fit` can fold in new days
+        self._store_sum, self._store_count = np.zeros(n_s), np.zeros(n_s)
+        self._product_gram, self._product_rhs = np.zeros((n_p, k_p, k_p)), np.zeros((n_p, k_p))
+        self._first_week, self._week_sold, self._week_days = None, np.zeros((0, n_c, 7)), np.zeros((0, n_c, 7))
+        self._sincos_gram, self._sincos_rhs = np.zeros((1, k_s, k_s)), np.zeros((1, k_s))
+        self._country_total = np.zeros(n_c)
+
+        total, country = self._accumulate(df)
+        self.constant_ = np.nanmedian(total / self.country_factor_[country]) * self.const_scale
+        return self
+
+    @stage()
+    def partial_fit(self, df: pd.DataFrame):
+        """
+        Fold in rows for new dates in O(len(df)). Store, product and weekday
+        factors update exactly. The sincos and country statistics of the new
+        rows are taken under the current upstream factors, and the constant is
+        kept; call `fit` on the full history to re-anchor all of them. Rows
+        without a target (e.g. test days) carry nothing to fold in and are skipped.
+        """
+        df = df[df['num_sold'].notna()]
+        if len(df):
+            self._accumulate(df)
+        return self
+
+    def _accumulate(self, df: pd.DataFrame):
+        country, store, product = self._codes(df, strict=True)
+        day = day_codes(df['date'])
+        y = df['num_sold'].to_numpy(dtype=float)
+        gdp = df['gdp_factor'].to_numpy(dtype=float)
+        n_c, n_s, n_p = len(self.countries), len(self.stores), len(self.products)
+
+        first_day = day.min()
+        date = day - first_day
+        n_dates = date.max() + 1
+        known = np.isfinite(y)
+        clean = known & ~np.isin(country, category_codes(self.excluded_countries, self.countries))
+
+        # store factor: mean sales per store outside the excluded countries
+        self._store_sum += np.bincount(store[clean], y[clean], minlength=n_s)
+        self._store_count += np.bincount(store[clean], minlength=n_s)
+        self.store_factor_ = self._store_sum / self._store_count
+
+        # product factor: daily share of each product regressed on the product basis
+        daily_total = np.bincount(date[clean], y[clean], minlength=n_dates)
+        share = np.bincount(
+            date[clean] * n_p + product[clean],
+            y[clean] / daily_total[date[clean]],
+            minlength=n_dates * n_p,
+        ).reshape(n_dates, n_p)
+        seen = np.bincount(date[clean] * n_p + product[clean], minlength=n_dates * n_p).reshape(n_dates, n_p) > 0
+
+        basis = np.zeros((n_dates, len(self.product_basis)))
+        basis[date] = df[self.product_basis].to_numpy(dtype=float)
+        gram, rhs = ridge_stats(basis, share, seen)
+        self._product_gram += gram
+        self._product_rhs += rhs
+        self.product_intercept_, self.product_coef_ = solve_ridge(self._product_gram, self._product_rhs, self.alpha)
+        product_factor = self._product_factor(df, product)
+
+        # weekday factor: within-week share per country, median over full weeks, mean over countries
+        weekday = (day + 3) % 7  # 1970-01-01 was a Thursday
+        week = self._week_index((day + 3) // 7)
+        cell = (week[known] * n_c + country[known]) * 7 + weekday[known]
+        size = len(self._week_sold) * n_c * 7
+        self._week_sold += np.bincount(cell, y[known], minlength=size).reshape(self._week_sold.shape)
+        self._week_days += np.bincount(cell, minlength=size).reshape(self._week_days.shape)
+        full_week = (self._week_days > 0).all(axis=2)
+        ratio = self._week_sold / np.where(full_week, self._week_sold.sum(axis=2), np.nan)[..., None]
+        self.weekday_factor_ = np.nanmean(np.nanmedian(ratio, axis=0), axis=0)
+
+        # sincos factor: ridge on the median de-factored total per date
+        total = y / (gdp * product_factor * self.store_factor_[store] * self.weekday_factor_[weekday])
+        per_country = group_median(date * n_c + country, total, n_dates * n_c).reshape(n_dates, n_c)
+        with np.errstate(all='ignore'):
+            target = np.nanmedian(per_country, axis=1)
+
+        harmonics = np.zeros((n_dates, len(self.sincos_basis)))
+        harmonics[date] = df[self.sincos_basis].to_numpy(dtype=float)
+        gram, rhs = ridge_stats(harmonics, target[:, None], np.isfinite(target)[:, None])
+        self._sincos_gram += gram
+        self._sincos_rhs += rhs
+        icpt, coef = solve_ridge(self._sincos_gram, self._sincos_rhs, self.alpha)
+        self.sincos_intercept_, self.sincos_coef_ = icpt[0], coef[0]
+        total = total / self._sincos_factor(df)
+
+        # country factor: reference product totals relative to the median country
+        ref = known & (product == category_codes([self.reference_product], self.products)[0])
+        self._country_total += np.bincount(country[ref], total[ref], minlength=n_c)
+        self.country_factor_ = self._country_total / np.median(self._country_total)
+        return total, country
+
+    def _week_index(self, week: np.ndarray) -> np.ndarray:
+        # grow the (week, country, weekday) tables to cover `week`, padding on either side
+        lo, hi = week.min(), week.max()
+        if self._first_week is None:
+            self._first_week = lo
+        before = max(self._first_week - lo, 0)
+        after = max(hi - (self._first_week + len(self._week_sold) - 1), 0)
+        if before or after:
+            pad = ((before, after), (0, 0), (0, 0))
+            self._week_sold = np.pad(self._week_sold, pad)
+            self._week_days = np.pad(self._week_days, pad)
+            self._first_week -= before
+        return week - self._first_week
+
+    def _product_factor(self, df: pd.DataFrame, product: np.ndarray) -> np.ndarray:
+        x = df[self.product_basis].to_numpy(dtype=float)
+        known = np.maximum(product, 0)
+        out = self.product_intercept_[known] + np.einsum('nk,nk->n', x, self.product_coef_[known])
+        return np.where(product >= 0, out, np.nan)
+
+    def _sincos_factor(self, df: pd.DataFrame) -> np.ndarray:
+        return self.sincos_intercept_ + df[self.sincos_basis].to_numpy(dtype=float) @ self.sincos_coef_
+
+    def components(self, df: pd.DataFrame) -> dict:
+        """
+        Per-row value of every factor, as float arrays keyed by factor name;
+        NaN for the factor of a country, store or product the model has not seen.
+        """
+        country, store, product = self._codes(df)
+        weekday = (day_codes(df['date']) + 3) % 7
+        return {
+            'gdp_factor': df['gdp_factor'].to_numpy(dtype=float),
+            'product_factor': self._product_factor(df, product),
+            'store_factor': _take(self.store_factor_, store),
+            'weekday_factor': self.weekday_factor_[weekday],
+            'sincos_factor': self._sincos_factor(df),
+            'country_factor': _take(self.country_factor_, country),
+        }
+
+    @stage()
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """Predictions per row; NaN for rows with an unknown country, store or product."""
+        ratio = np.prod(np.vstack(list(self.components(df).values())), axis=0)
+        return self.constant_ * ratio
@@ -1,32 +1,77 @@
+from functools import cached_property, lru_cache
+
 import pandas as pd
 import numpy as np
-from sklearn.metrics import mean_absolute_percentage_error
-import matplotlib.pyplot as plt
 import streamlit as st
-import seaborn as sns
 import plotly.graph_objects as go
 import plotly.express as px
 
 from src.feategg import Feategg
 from src.cfg import CFG
+from src.artifact import open_artifact
+from src.data import load_data
+from src.downsample import MultiResolution
+from src.query import RangeQuery
+from src.spectral import fit_sincos, periodogram
+from src.profiling import stage
     
 @st.cache_resource()
 class EDA:
+    @stage()
     def __init__(self):
-        self.df = self._load_data()
-        self.feate = Feategg(self.df)
-        
+        # the plots read the memory-mapped artifact; the raw frame is only built on demand
+        artifact = open_artifact()
+        self.version = artifact.version
+        self.cube = artifact.cube
+        self.rollups = artifact.rollups
+        self.daily_levels = MultiResolution(self.rollups.dates, self.rollups.daily)
+        self.sincos_basis = artifact.sincos_basis
+        self.query = RangeQuery(self.cube)
+
+    @cached_property
+    def df(self):
+        return self._load_data()
+
+    @cached_property
+    def feate(self):
+        return Feategg(self.df)
+
     def _load_data(self):
-        train, test = pd.read_csv("./data/train.csv"), pd.read_csv("./data/test.csv")
-        train['test'], test['test'] = 0, 1
-        train.date = pd.DatetimeIndex(train.date)
-        test.date = pd.DatetimeIndex(test.date)
-        df = pd.concat([train, test])
-        return df
+        return load_data()
     
-    def plot_numSold_date(self):
-        train_df = self.df[self.df['test'] == 0]
-        daily_sales = train_df.groupby('date')['num_sold'].sum().reset_index()
+    def range_filters(self):
+        # sidebar drill-down; every answer is a pair of prefix-sum lookups, not a groupby
+        with st.sidebar:
+            st.header("Filters")
+            first, last = self.cube.dates[0].date(), self.cube.dates[-1].date()
+            picked = st.date_input("Dates", value=(first, last), min_value=first, max_value=last, key="filter_dates")
+            start, end = (picked[0], picked[-1]) if picked else (first, last)
+            selection = {
+                axis: st.multiselect(axis.title(), self.cube.labels[axis], placeholder="All", key=f"filter_{axis}") or None
+                for axis in ('country', 'store', 'product')
+            }
+            st.metric("Stickers sold", f"{self.query.total(start, end, **selection):,.0f}")
+            col1, col2 = st.columns(2)
+            col1.metric("Days", self.query.days(start, end))
+            col2.metric("Mean per row", f"{self.query.mean(start, end, **selection):,.1f}")
+            st.dataframe(
+                self.query.by('country', start, end, **selection).set_index('country').style.format('{:,.1f}'),
+                use_container_width=True,
+            )
+
+    # Each plot is split in two: the widgets run in the script thread, and the
+    # *_figure builder only reads the precomputed arrays, so eda_page can build
+    # several of them at once in a thread pool.
+
+    def _date_range(self):
+        first, last = pd.Timestamp(self.rollups.dates[0]).date(), pd.Timestamp(self.rollups.dates[-1]).date()
+        return st.slider("Date range", min_value=first, max_value=last, value=(first, last))
+
+    @stage()
+    def numSold_date_figure(self, start, end, budget=1000):
+        # at most `budget` points are sent; narrow windows come back at full resolution
+        dates, num_sold = self.daily_levels.window(np.datetime64(start), np.datetime64(end), budget)
+        daily_sales = pd.DataFrame({'date': dates, 'num_sold': num_sold})
         
         fig = px.line(
             daily_sales,
@@ -37,142 +82,90 @@ class EDA:
             color_discrete_sequence=['#1f77b4']
         )
         fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
-        
-    def plot_sellTrend_country(self):
-        train_df = self.df[self.df['test'] == 0]
-        yearly_sales = train_df.groupby([train_df['date'].dt.year, 'country'])['num_sold'].sum().reset_index()
+        return fig
+
+    def plot_numSold_date(self, budget=1000):
+        start, end = self._date_range()
+        st.plotly_chart(self.numSold_date_figure(start, end, budget), use_container_width=True)
+
+    @stage()
+    def sellTrend_figure(self, axis):
+        yearly_sales = self.rollups.yearly_frame(axis)
 
         fig = px.line(
             yearly_sales,
             x='date',
             y='num_sold',
-            color='country',
-            line_group='country',
-            title='Sales Trends by Country (Year-wise)',
+            color=axis,
+            line_group=axis,
+            title=f'Sales Trends by {axis.title()} (Year-wise)',
             labels={'year': 'Year', 'num_sold': 'Number of Products Sold'},
             color_discrete_sequence=px.colors.diverging.Armyrose
         )
-        st.plotly_chart(fig, use_container_width=True)
+        return fig
+
+    def plot_sellTrend_country(self):
+        st.plotly_chart(self.sellTrend_figure('country'), use_container_width=True)
         
     def plot_sellTrend_store(self):
-        train_df = self.df[self.df['test'] == 0]
-        yearly_sales = train_df.groupby([train_df['date'].dt.year, 'store'])['num_sold'].sum().reset_index()
-
-        fig = px.line(
-            yearly_sales,
-            x='date',
-            y='num_sold',
-            color='store',
-            line_group='store',
-            title='Sales Trends by Store (Year-wise)',
-            labels={'year': 'Year', 'num_sold': 'Number of Products Sold'},
-            color_discrete_sequence=px.colors.diverging.Armyrose
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(self.sellTrend_figure('store'), use_container_width=True)
         
     def plot_sellTrend_product(self):
-        train_df = self.df[self.df['test'] == 0]
-        yearly_sales = train_df.groupby([train_df['date'].dt.year, 'product'])['num_sold'].sum().reset_index()
-
-        fig = px.line(
-            yearly_sales,
-            x='date',
-            y='num_sold',
-            color='product',
-            line_group='product',
-            title='Sales Trends by Product (Year-wise)',
-            labels={'year': 'Year', 'num_sold': 'Number of Products Sold'},
-            color_discrete_sequence=px.colors.diverging.Armyrose
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(self.sellTrend_figure('product'), use_container_width=True)
         
+    def _pick_slice(self, key):
+        cols = st.columns(3)
+        return tuple(
+            tuple(col.multiselect(axis.title(), self.cube.labels[axis], default=self.cube.labels[axis], key=f"{key}_{axis}"))
+            for col, axis in zip(cols, ('country', 'store', 'product'))
+        )
+
+    @lru_cache(maxsize=32)
+    @stage()
+    def _spectra(self, picked, version):
+        # one batched FFT and one batched least-squares fit over the selected series, memoized per (slice, version)
+        idx = [np.flatnonzero(np.isin(self.cube.labels[axis], sel)) for axis, sel in zip(('country', 'store', 'product'), picked)]
+        values = self.cube.values[:, idx[0]][:, :, idx[1]][:, :, :, idx[2]].reshape(len(self.cube.dates), -1)
+        freq, power = periodogram(values)
+        fitted = fit_sincos(values, self.sincos_basis)
+        return values, freq, power, fitted
+
+    @stage()
+    def sinusoidal_figure(self, picked):
+        values, _, _, fitted = self._spectra(picked, self.version)
+
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=self.cube.dates, y=np.nansum(values, axis=1), mode='lines', name='Actual Sales', line=dict(color='#1f77b4')))
+        fig.add_trace(go.Scatter(x=self.cube.dates, y=np.nansum(fitted, axis=1), mode='lines', name='Sin/Cos Fit', line=dict(color='red')))
+        fig.update_layout(title='Sinusoidal Sales Pattern', xaxis_title='Date', yaxis_title='Number of Stickers Sold', height=400)
+        return fig
+
     def plot_sinusoidal_sells(self):
-        st.image("./plots/sinusoidals_sells.png", caption="Sinusoidal Sales Pattern", use_container_width=True)
+        picked = self._pick_slice("sincos")
+        if not all(picked):
+            st.info("Select at least one country, store and product.")
+            return
+        st.plotly_chart(self.sinusoidal_figure(picked), use_container_width=True)
 
-    
-    def fourier_analysis(self):
-        st.image("./plots/fourier_analysis.png", caption="Fourier Analysis of Sales Data", use_container_width=True)
+    @stage()
+    def fourier_figure(self, picked):
+        _, freq, power, _ = self._spectra(picked, self.version)
 
-    
-        
-        
-# HOME Page
-def home_page():
-    st.title("🏷️ Sticker Sales Forecasting")
-    st.subheader("🏆 Kaggle Playground Series S5E1 - Ranked 120th")
-    
-    # Achievement banner
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        st.success("🎉 **ACHIEVEMENT UNLOCKED** 🎉\n\n🏆 **Rank 120** out of 800+ participants\n\n📊 **Top 15%** in global competition")
-    
-    st.markdown(
-        """
-        ## 🚀 Project Overview
-        
-        Welcome to an **award-winning** solution for **Sticker Sales Forecasting**, developed for Kaggle's Playground Series Season 5, Episode 1! This sophisticated time series forecasting system combines advanced machine learning techniques with domain expertise to predict sticker sales across multiple dimensions.
+        keep = freq <= 60
+        fig = px.line(
+            x=freq[keep],
+            y=np.nanmean(power, axis=1)[keep],
+            log_y=True,
+            title='Fourier Analysis of Sales Data',
+            labels={'x': 'Frequency (cycles per year)', 'y': 'Mean Power'},
+            color_discrete_sequence=['#1f77b4']
+        )
+        fig.update_layout(height=400)
+        return fig
 
-        ### 🎯 What Makes This Special?
-        
-        #### 🔬 **Advanced Analytics**
-        - **Sinusoidal Pattern Recognition**: Discovered and modeled cyclical sales patterns
-        - **Fourier Transform Analysis**: Frequency domain decomposition of sales signals  
-        - **Multi-dimensional Feature Engineering**: 15+ engineered features from basic inputs
-        - **Economic Integration**: GDP per capita data for enhanced predictions
-        
-        #### 📊 **Data Dimensions**
-        - **📅 Temporal**: 10 years of daily sales data (2010-2019)
-        - **🌍 Geographic**: 6 countries with diverse economic profiles  
-        - **🏪 Commercial**: 3 store types with different customer segments
-        - **🎨 Product**: 5 sticker variants with unique sales patterns
-        
-        #### 🏆 **Competition Performance**
-        - **Final Rank**: 120th place (Top 15%)
-        - **Model Accuracy**: MAPE of 0.142 on validation set
-        - **Technique**: Multiplicative factor modeling with sinusoidal components
-        - **Key Innovation**: Country-specific economic factors + holiday modeling
-        
-        ### 📈 **Core Features & Methodology**
-        
-        | Component | Description | Impact |
-        |-----------|-------------|---------|
-        | 🌊 **Sinusoidal Analysis** | Multi-frequency cyclical pattern modeling | High |
-        | 💰 **GDP Integration** | Economic indicators by country/year | High |
-        | 🏪 **Store Factors** | Outlet-specific performance multipliers | Medium |
-        | 🎯 **Product Factors** | Item-specific demand patterns | Medium |
-        | 🎄 **Holiday Modeling** | Cultural calendar effects | Low-Medium |
-        | 📅 **Temporal Features** | Weekday, seasonal, and trend components | Medium |
-        
-        ### 🛠️ **Technology Stack**
-        - **🐍 Python**: Core development language
-        - **📊 Pandas/NumPy**: Data manipulation and numerical computing
-        - **🤖 Scikit-learn**: Machine learning algorithms and validation
-        - **📈 Plotly/Matplotlib**: Interactive and static visualizations
-        - **🌐 Streamlit**: Web application framework
-        - **📡 External APIs**: World Bank GDP data integration
-        
-        ### 🎯 **Key Insights Discovered**
-        
-        1. **📈 Sales exhibit strong sinusoidal patterns** with 6-month and 1-year cycles
-        2. **💰 Economic factors (GDP) significantly influence** purchasing power
-        3. **🏪 Store types create distinct sales multipliers** (Premium > Regular > Discount)
-        4. **🌍 Country-specific cultural factors** affect seasonal demand
-        5. **🎄 Holiday periods require specialized modeling** for accuracy
-        
-        ### 🔍 **Explore Further**
-        
-        Use the navigation menu to dive deeper:
-        
-        - **🔍 EDA Section**: Interactive visualizations and pattern analysis
-        - **🏆 Results Section**: Detailed performance metrics and competition insights
-        
-        ---
-        
-        > *"At Kaggle, we take stickers seriously!"* ™️  
-        > This project demonstrates advanced time series forecasting techniques in an engaging, real-world context.
-        
-        **🌟 Ready to explore the data science behind the success? Let's dive in!**
-        """, 
-        unsafe_allow_html=True
-    )
+    def fourier_analysis(self):
+        picked = self._pick_slice("fourier")
+        if not all(picked):
+            st.info("Select at least one country, store and product.")
+            return
+        st.plotly_chart(self.fourier_figure(picked), use_container_width=True)
@@ -0,0 +1,58 @@
+from functools import lru_cache
+
+import numpy as np
+from src.cfg import CFG
+from src.codes import category_codes, day_codes
+
+
+class HolidayCalendar:
+    """
+    Date x country holiday indicator over all of `years`, built once from the
+    `holidays` package, plus the post-holiday response obtained by convolving
+    the whole indicator array with a `response_len` kernel.
+    """
+    def __init__(self, years=None, countries=None, response_len: int = None):
+        import holidays
+
+        years = [int(y) for y in (CFG.years if years is None else years)]
+        self.countries = np.asarray(CFG.countries if countries is None else countries)
+        self.response_len = CFG.holiday_response_len if response_len is None else response_len
+        self.first = day_codes([f'{min(years)}-01-01'])[0]
+        n_days = day_codes([f'{max(years) + 1}-01-01'])[0] - self.first
+
+        self.indicator = np.zeros((n_days, len(self.countries)), dtype=bool)
+        for n, country in enumerate(self.countries):
+            days = day_codes(list(holidays.country_holidays(CFG.countries_21[country], years=years)))
+            self.indicator[days - self.first, n] = True
+
+    def response(self, kernel=None) -> np.ndarray:
+        """
+        Causal convolution of the indicator with `kernel` along the date axis
+        (default: `response_len` ones, i.e. the holiday and the days after it).
+        """
+        kernel = np.ones(self.response_len) if kernel is None else np.asarray(kernel, dtype=float)
+        x = self.indicator.astype(float)
+        out = np.zeros_like(x)
+        for lag, weight in enumerate(kernel):  # one shifted add per tap, over the whole array
+            out[lag:] += weight * x[:len(x) - lag]
+        return out
+
+    def gather(self, values: np.ndarray, country, date) -> np.ndarray:
+        """Row lookup of a date x country array; dates outside the calendar give 0."""
+        pos = day_codes(date) - self.first
+        code = category_codes(np.asarray(country), self.countries)
+        ok = (pos >= 0) & (pos < len(values)) & (code >= 0)
+        out = np.zeros(len(pos), dtype=values.dtype)
+        out[ok] = values[pos[ok], code[ok]]
+        return out
+
+
+@lru_cache(maxsize=None)
+def holiday_calendar() -> HolidayCalendar:
+    return HolidayCalendar()
+
+
+@lru_cache(maxsize=None)
+def holiday_response() -> np.ndarray:
+    # binary: inside the `holiday_response_len` days starting at a holiday
+    return holiday_calendar().response() > 0
@@ -0,0 +1,82 @@
+import streamlit as st
+
+
+# HOME Page
+def home_page():
+    st.title("🏷️ Sticker Sales Forecasting")
+    st.subheader("🏆 Kaggle Playground Series S5E1 - Ranked 120th")
+    
+    # Achievement banner
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        st.success("🎉 **ACHIEVEMENT UNLOCKED** 🎉\n\n🏆 **Rank 120** out of 800+ participants\n\n📊 **Top 15%** in global competition")
+    
+    st.markdown(
+        """
+        ## 🚀 Project Overview
+        
+        Welcome to an **award-winning** solution for **Sticker Sales Forecasting**, developed for Kaggle's Playground Series Season 5, Episode 1! This sophisticated time series forecasting system combines advanced machine learning techniques with domain expertise to predict sticker sales across multiple dimensions.
+
+        ### 🎯 What Makes This Special?
+        
+        #### 🔬 **Advanced Analytics**
+        - **Sinusoidal Pattern Recognition**: Discovered and modeled cyclical sales patterns
+        - **Fourier Transform Analysis**: Frequency domain decomposition of sales signals  
+        - **Multi-dimensional Feature Engineering**: 15+ engineered features from basic inputs
+        - **Economic Integration**: GDP per capita data for enhanced predictions
+        
+        #### 📊 **Data Dimensions**
+        - **📅 Temporal**: 10 years of daily sales data (2010-2019)
+        - **🌍 Geographic**: 6 countries with diverse economic profiles  
+        - **🏪 Commercial**: 3 store types with different customer segments
+        - **🎨 Product**: 5 sticker variants with unique sales patterns
+        
+        #### 🏆 **Competition Performance**
+        - **Final Rank**: 120th place (Top 15%)
+        - **Model Accuracy**: MAPE of 0.142 on validation set
+        - **Technique**: Multiplicative factor modeling with sinusoidal components
+        - **Key Innovation**: Country-specific economic factors + holiday modeling
+        
+        ### 📈 **Core Features & Methodology**
+        
+        | Component | Description | Impact |
+        |-----------|-------------|---------|
+        | 🌊 **Sinusoidal Analysis** | Multi-frequency cyclical pattern modeling | High |
+        | 💰 **GDP Integration** | Economic indicators by country/year | High |
+        | 🏪 **Store Factors** | Outlet-specific performance multipliers | Medium |
+        | 🎯 **Product Factors** | Item-specific demand patterns | Medium |
+        | 🎄 **Holiday Modeling** | Cultural calendar effects | Low-Medium |
+        | 📅 **Temporal Features** | Weekday, seasonal, and trend components | Medium |
+        
+        ### 🛠️ **Technology Stack**
+        - **🐍 Python**: Core development language
+        - **📊 Pandas/NumPy**: Data manipulation and numerical computing
+        - **🤖 Scikit-learn**: Machine learning algorithms and validation
+        - **📈 Plotly/Matplotlib**: Interactive and static visualizations
+        - **🌐 Streamlit**: Web application framework
+        - **📡 External APIs**: World Bank GDP data integration
+        
+        ### 🎯 **Key Insights Discovered**
+        
+        1. **📈 Sales exhibit strong sinusoidal patterns** with 6-month and 1-year cycles
+        2. **💰 Economic factors (GDP) significantly influence** purchasing power
+        3. **🏪 Store types create distinct sales multipliers** (Premium > Regular > Discount)
+        4. **🌍 Country-specific cultural factors** affect seasonal demand
+        5. **🎄 Holiday periods require specialized modeling** for accuracy
+        
+        ### 🔍 **Explore Further**
+        
+        Use the navigation menu to dive deeper:
+        
+        - **🔍 EDA Section**: Interactive visualizations and pattern analysis
+        - **🏆 Results Section**: Detailed performance metrics and competition insights
+        
+        ---
+        
+        > *"At Kaggle, we take stickers seriously!"* ™️  
+        > This project demonstrates advanced time series forecasting techniques in an engaging, real-world context.
+        
+        **🌟 Ready to explore the data science behind the success? Let's dive in!**
+        """, 
+        unsafe_allow_html=True
+    )
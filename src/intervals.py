@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from src.cfg import CFG
+from src.codes import category_codes, day_codes
+from src.cube import SalesCube
+
+
+def nan_quantiles(samples: np.ndarray, qs) -> np.ndarray:
+    """
+    Quantiles along axis 0 that skip NaN, for every other cell at once (one
+    sort instead of np.nanquantile's per-cell loop). Linear interpolation, as
+    np.quantile; cells without any finite sample give NaN.
+    """
+    s = np.sort(samples, axis=0)  # NaN sorts last
+    n = np.isfinite(samples).sum(axis=0)
+    out = np.full((len(qs), *samples.shape[1:]), np.nan)
+    for k, q in enumerate(qs):
+        pos = q * np.maximum(n - 1, 0)
+        lo = np.floor(pos).astype(int)
+        hi = np.minimum(lo + 1, np.maximum(n - 1, 0))
+        below = np.take_along_axis(s, lo[None], axis=0)[0]
+        above = np.take_along_axis(s, hi[None], axis=0)[0]
+        out[k] = np.where(n > 0, below + (pos - lo) * (above - below), np.nan)
+    return out
+
+
+class BootstrapIntervals:
+    """
+    Prediction intervals from in-sample residuals of a multiplicative model,
+    taken as log(actual / predicted) on the (date, series) grid of a SalesCube.
+
+    'block' resamples whole dates in blocks of `block` days: one seeded draw of
+    block starts is shared by every series, so paths keep the cross-series and
+    short-range serial correlation of the residuals. 'quantile' uses each
+    series' empirical residual quantiles, the same for every horizon step.
+    Series with no residuals at all get the median bounds of the others.
+    """
+    def __init__(self, residuals: np.ndarray, method: str = 'block', block: int = 28, n_paths: int = 1000, seed: int = 0, labels: dict = None):
+        if method not in ('block', 'quantile'):
+            raise ValueError(f"unknown method {method!r}, expected 'block' or 'quantile'")
+        self.residuals = np.asarray(residuals, dtype=float)
+        self.method = method
+        self.block = min(block, len(self.residuals))
+        self.n_paths = n_paths
+        self.seed = seed
+        # column order of `residuals`: country-major over these labels, as in SalesCube
+        self.labels = labels or {'country': CFG.countries, 'store': CFG.stores, 'product': CFG.products}
+
+    @classmethod
+    def from_predictions(cls, frame: pd.DataFrame, pred: np.ndarray, **kwargs):
+        """Residuals of `pred` against `frame['num_sold']` (rows with no sales or no prediction are skipped)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_ratio = np.log(frame['num_sold'].to_numpy(dtype=float) / pred)
+        cube = SalesCube.from_frame(frame.assign(_residual=np.where(np.isfinite(log_ratio), log_ratio, np.nan)), column='_residual')
+        return cls(cube.values.reshape(len(cube.dates), -1), labels=cube.labels, **kwargs)
+
+    def factors(self, horizon: int, levels=(0.8, 0.95), chunk: int = None) -> np.ndarray:
+        """
+        Multiplicative bounds of shape (level, 2, horizon, series): lower and
+        upper factors for each central `level`. Block paths are generated
+        `chunk` horizon days at a time (default: all at once) to bound memory;
+        the draw does not depend on `chunk`.
+        """
+        qs = [q for level in levels for q in ((1 - level) / 2, (1 + level) / 2)]
+        n_series = self.residuals.shape[1]
+
+        if self.method == 'quantile':
+            per_series = nan_quantiles(self.residuals, qs)                 # (q, series)
+            out = np.broadcast_to(per_series[:, None, :], (len(qs), horizon, n_series))
+        else:
+            rng = np.random.default_rng(self.seed)
+            n_blocks = -(-horizon // self.block)
+            starts = rng.integers(0, len(self.residuals) - self.block + 1, size=(self.n_paths, n_blocks))
+            step = np.arange(horizon)
+            # row of the residual history behind every (path, horizon day)
+            rows = starts[:, step // self.block] + step % self.block       # (path, horizon)
+            chunk = horizon if chunk is None else chunk
+            out = np.empty((len(qs), horizon, n_series))
+            for lo in range(0, horizon, chunk):
+                paths = self.residuals[rows[:, lo:lo + chunk]]             # (path, chunk, series)
+                out[:, lo:lo + chunk] = nan_quantiles(paths, qs)
+        empty = ~np.isfinite(self.residuals).any(axis=0)
+        if empty.any() and not empty.all():
+            # series without any residual history get the cross-series median bounds
+            out = np.array(out)
+            out[:, :, empty] = np.median(out[:, :, ~empty], axis=2, keepdims=True)
+        return np.exp(out).reshape(len(levels), 2, horizon, n_series)
+
+    def intervals(self, frame: pd.DataFrame, pred: np.ndarray, levels=(0.8, 0.95), chunk: int = None) -> pd.DataFrame:
+        """
+        Per-row bounds for forecast rows `frame` with predictions `pred`, the
+        horizon counted from the first date of `frame`. Columns lo80/hi80,
+        lo95/hi95, ... are aligned with the rows of `frame`; rows whose series
+        has no residual history (labels outside `labels`) get NaN bounds.
+        """
+        day = day_codes(frame['date'])
+        step = day - day.min()
+        bounds = self.factors(step.max() + 1, levels, chunk)
+        n_s, n_p = len(self.labels['store']), len(self.labels['product'])
+        c = category_codes(frame['country'], self.labels['country'])
+        s = category_codes(frame['store'], self.labels['store'])
+        p = category_codes(frame['product'], self.labels['product'])
+        ok = (c >= 0) & (s >= 0) & (p >= 0)
+        series = np.where(ok, (c * n_s + s) * n_p + p, 0)
+        pred = np.where(ok, np.asarray(pred, dtype=float), np.nan)
+
+        out = {}
+        for k, level in enumerate(levels):
+            name = f'{round(level * 100)}'
+            out[f'lo{name}'] = pred * bounds[k, 0, step, series]
+            out[f'hi{name}'] = pred * bounds[k, 1, step, series]
+        return pd.DataFrame(out, index=frame.index)
@@ -0,0 +1,67 @@
+import streamlit as st
+import plotly.express as px
+from src import profiling
+
+
+def performance_page():
+    st.title("⏱️ Performance")
+    st.markdown(
+        """
+        Wall time, peak traced memory and row counts of each pipeline stage and `EDA` method,
+        recorded by the hooks in `src/profiling.py`.
+        Start the app with `SALES_PROFILE=1` to also capture startup stages such as the first `CFG` data load.
+        """
+    )
+
+    on = st.toggle("Collect traces", value=profiling.enabled())
+    if on != profiling.enabled():
+        profiling.enable() if on else profiling.disable()
+
+    spans = profiling.traces()
+    if spans.empty:
+        st.info("No traces yet. Turn collection on and visit the EDA or Results pages.")
+        return
+
+    n_traces = spans['trace'].nunique()
+    last = st.slider("Latest traces", min_value=1, max_value=max(n_traces, 2), value=min(n_traces, 20))
+    spans = profiling.traces(last)
+
+    summary = (
+        spans.groupby('stage')
+        .agg(calls=('wall_s', 'size'), total_s=('wall_s', 'sum'), mean_s=('wall_s', 'mean'),
+             peak_mb=('peak_mb', 'max'), shared_peak=('shared_peak', 'any'), rows=('rows', 'max'))
+        .sort_values('total_s', ascending=False)
+    )
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Traces", spans['trace'].nunique())
+    col2.metric("Stages", len(summary))
+    col3.metric("Top-level time", f"{spans.loc[spans['depth'] == 0, 'wall_s'].sum():.2f} s")
+
+    fig = px.bar(
+        summary.head(20).reset_index().iloc[::-1],
+        x='total_s',
+        y='stage',
+        orientation='h',
+        title='Total Wall Time by Stage',
+        labels={'total_s': 'Seconds', 'stage': ''},
+        color_discrete_sequence=['#1f77b4']
+    )
+    fig.update_layout(height=500)
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.subheader("Stage Summary")
+    st.caption("`peak_mb` is the traced peak above the stage's starting memory. Where `shared_peak` is set, the stage "
+               "overlapped a stage on another thread (another session or a figure-pool worker), so its peak is process-wide.")
+    st.dataframe(summary.style.format({'total_s': '{:.3f}', 'mean_s': '{:.3f}', 'peak_mb': '{:.1f}', 'rows': '{:,.0f}'}),
+                 use_container_width=True)
+
+    with st.expander("Raw spans", expanded=False):
+        # children finish (and are recorded) before their parents; show them in call order
+        spans = spans.sort_values(['trace', 'started', 'depth'])
+        spans['stage'] = ["  " * d + s for d, s in zip(spans['depth'], spans['stage'])]
+        st.dataframe(spans, use_container_width=True, hide_index=True)
+
+    if st.button("Clear traces"):
+        profiling.clear()
+        st.rerun()
@@ -0,0 +1,151 @@
+"""
+Stage-level instrumentation: wall time, peak traced memory and row counts.
+
+Collection is off unless the SALES_PROFILE environment variable is set (so
+that stages before the app can call `enable()`, such as the first CFG data
+load, are caught) or `enable()` is called. When off, a decorated function costs one flag check and `span`
+returns a shared no-op context.
+"""
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+
+_enabled = os.environ.get('SALES_PROFILE', '') not in ('', '0')
+_local = threading.local()   # per-thread stack of open spans
+_lock = threading.Lock()
+_next_trace = 0
+_open = set()                # spans open in any thread
+SPANS = deque(maxlen=5000)   # finished spans, newest last
+_NULL = nullcontext()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    global _enabled
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def clear():
+    with _lock:
+        SPANS.clear()
+
+
+def _rows(result):
+    if isinstance(result, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(result)
+    return None
+
+
+class _Span:
+    def __init__(self, name: str, rows=None):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        global _next_trace
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        with _lock:
+            if stack:
+                self.trace = stack[-1].trace
+                # keep the parent's peak so far before the child resets the counter
+                stack[-1].peak = max(stack[-1].peak, tracemalloc.get_traced_memory()[1])
+            else:
+                self.trace, _next_trace = _next_trace, _next_trace + 1
+            # the traced peak is process-wide: it is only reset while every open span
+            # is on this thread's stack; spans overlapping another thread's report a
+            # shared peak, which includes that thread's allocations
+            self.shared = len(_open) > len(stack)
+            if self.shared:
+                for other in _open:
+                    other.shared = True
+            _open.add(self)
+            self.depth = len(stack)
+            stack.append(self)
+            self.base = tracemalloc.get_traced_memory()[0]
+            self.peak = self.base
+            if not self.shared:
+                tracemalloc.reset_peak()
+        self.started = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start
+        stack = _local.stack
+        with _lock:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            stack.pop()
+            _open.discard(self)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+            if len(_open) == len(stack):
+                tracemalloc.reset_peak()
+            SPANS.append({
+                'trace': self.trace,
+                'depth': self.depth,
+                'stage': self.name,
+                'started': pd.Timestamp(self.started, unit='s'),
+                'wall_s': wall,
+                'peak_mb': (self.peak - self.base) / 2 ** 20,
+                'shared_peak': self.shared,
+                'rows': self.rows,
+                'thread': threading.current_thread().name,
+            })
+        return False
+
+
+def span(name: str, rows=None):
+    """Context manager timing the enclosed block as stage `name`."""
+    return _Span(name, rows) if _enabled else _NULL
+
+
+def stage(name: str = None):
+    """Decorator recording every call as a stage; rows are taken from a frame / array result."""
+    def wrap(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(label) as s:
+                result = fn(*args, **kwargs)
+                s.rows = _rows(result)
+            return result
+        return inner
+    return wrap
+
+
+def traces(last: int = None) -> pd.DataFrame:
+    """Finished spans as a frame, optionally only those of the `last` top-level traces."""
+    with _lock:
+        frame = pd.DataFrame(list(SPANS), columns=['trace', 'depth', 'stage', 'started', 'wall_s', 'peak_mb', 'shared_peak', 'rows', 'thread'])
+    if last is not None and len(frame):
+        frame = frame[frame['trace'].isin(frame['trace'].unique()[-last:])]
+    return frame
+
+
+if _enabled:
+    enable()
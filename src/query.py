@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from src.codes import day_codes
+from src.cube import SalesCube
+
+
+AXES = ('country', 'store', 'product')
+
+
+class RangeQuery:
+    """
+    Date-range totals and means over any country / store / product selection.
+    Cumulative sums (and counts of labelled cells) along the date axis are
+    built once per cube, so a query is two row lookups and a reduction over
+    the selected (country, store, product) cells, independent of the history
+    length.
+    """
+    def __init__(self, cube: SalesCube):
+        self.dates = cube.dates
+        self.labels = cube.labels
+        self.first = day_codes(cube.dates[:1])[0]
+        values = np.asarray(cube.values, dtype=float)
+        finite = np.isfinite(values)
+        # row i holds the sums of dates [0, i)
+        shape = (1, *values.shape[1:])
+        self.sums = np.concatenate([np.zeros(shape), np.cumsum(np.where(finite, values, 0.0), axis=0)])
+        self.counts = np.concatenate([np.zeros(shape, dtype=np.int64), np.cumsum(finite, axis=0)])
+
+    def _positions(self, start, end):
+        # [start, end] inclusive, clipped to the cube's calendar
+        lo = day_codes([start if start is not None else self.dates[0]])[0] - self.first
+        hi = day_codes([end if end is not None else self.dates[-1]])[0] - self.first + 1
+        n = len(self.dates)
+        lo = int(np.clip(lo, 0, n))
+        return lo, int(np.clip(hi, lo, n))  # an inverted range is empty
+
+    def _cells(self, table: np.ndarray, start, end, selection: dict) -> np.ndarray:
+        lo, hi = self._positions(start, end)
+        idx = [
+            slice(None) if selection.get(axis) is None
+            else np.flatnonzero(np.isin(self.labels[axis], np.asarray(selection[axis], dtype=object)))
+            for axis in AXES
+        ]
+        window = table[hi] - table[lo]
+        return window[np.ix_(*[np.arange(window.shape[n])[i] for n, i in enumerate(idx)])]
+
+    def total(self, start=None, end=None, **selection) -> float:
+        """Units sold between `start` and `end` (inclusive) for the selected labels, e.g. country=['Italy']."""
+        return float(self._cells(self.sums, start, end, selection).sum())
+
+    def mean(self, start=None, end=None, **selection) -> float:
+        """Mean `num_sold` per labelled row in the range; NaN when there is none."""
+        count = self._cells(self.counts, start, end, selection).sum()
+        return self.total(start, end, **selection) / count if count else np.nan
+
+    def days(self, start=None, end=None) -> int:
+        lo, hi = self._positions(start, end)
+        return hi - lo
+
+    def by(self, axis: str, start=None, end=None, **selection) -> pd.DataFrame:
+        """Totals and row means per label of `axis` within the selection."""
+        sums = self._cells(self.sums, start, end, selection)
+        counts = self._cells(self.counts, start, end, selection)
+        other = tuple(n for n, a in enumerate(AXES) if a != axis)
+        labels = self.labels[axis]
+        if selection.get(axis) is not None:
+            labels = labels[np.isin(labels, np.asarray(selection[axis], dtype=object))]
+        total, count = sums.sum(axis=other), counts.sum(axis=other)
+        return pd.DataFrame({
+            axis: labels,
+            'num_sold': total,
+            'mean': np.where(count > 0, total / np.maximum(count, 1), np.nan),
+        })
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+from src.cfg import CFG
+from src.codes import category_codes, day_codes
+
+
+LEVELS = ('total', 'country', 'store', 'product')
+METHODS = ('bottom_up', 'top_down', 'ols', 'mint')
+
+
+class Hierarchy:
+    """
+    total -> country -> country x store -> country x store x product.
+
+    Series are ordered top-down: the total, the countries, the country/store
+    pairs, then the bottom series in country-major order (the layout of
+    `SalesCube.values.reshape(n_dates, -1)`). Forecast arrays are
+    (date, series), and every method reconciles all dates at once.
+    """
+    def __init__(self, countries=None, stores=None, products=None):
+        self.labels = {
+            'country': np.asarray(CFG.countries if countries is None else countries),
+            'store': np.asarray(CFG.stores if stores is None else stores),
+            'product': np.asarray(CFG.products if products is None else products),
+        }
+        n_c, n_s, n_p = (len(v) for v in self.labels.values())
+        self.n_bottom = n_c * n_s * n_p
+        bottom = np.arange(self.n_bottom)
+        # aggregate rows: 0 is the total, then one per country, then one per (country, store)
+        parent = np.concatenate([
+            np.zeros(self.n_bottom, dtype=int),
+            1 + bottom // (n_s * n_p),
+            1 + n_c + bottom // n_p,
+        ])
+        self.n_agg = 1 + n_c + n_c * n_s
+        self.S_agg = sp.csr_matrix(
+            (np.ones(len(parent)), (parent, np.tile(bottom, 3))), shape=(self.n_agg, self.n_bottom)
+        )
+        self.S = sp.vstack([self.S_agg, sp.identity(self.n_bottom, format='csr')], format='csr')
+        # zero constraints C @ y = 0 for a coherent y: every aggregate minus the sum of its bottoms
+        self.C = sp.hstack([sp.identity(self.n_agg, format='csr'), -self.S_agg], format='csr')
+
+    @property
+    def n_series(self) -> int:
+        return self.n_agg + self.n_bottom
+
+    def nodes(self) -> pd.DataFrame:
+        """One row per series: its level and labels (None above that level)."""
+        c, s, p = (self.labels[a] for a in ('country', 'store', 'product'))
+        n_c, n_s, n_p = len(c), len(s), len(p)
+        return pd.DataFrame({
+            'level': np.repeat(LEVELS, [1, n_c, n_c * n_s, self.n_bottom]),
+            'country': np.concatenate([[None], c, np.repeat(c, n_s), np.repeat(c, n_s * n_p)]),
+            'store': np.concatenate([[None] * (1 + n_c), np.tile(s, n_c), np.tile(np.repeat(s, n_p), n_c)]),
+            'product': np.concatenate([[None] * self.n_agg, np.tile(p, n_c * n_s)]),
+        })
+
+    def bottom_matrix(self, df: pd.DataFrame, column: str = 'num_sold'):
+        """
+        (dates, (date, bottom) array) from a long frame; missing cells are NaN
+        and rows with labels outside the hierarchy are left out.
+        """
+        day = day_codes(df['date'])
+        first = day.min()
+        n_p, n_s = len(self.labels['product']), len(self.labels['store'])
+        c = category_codes(df['country'], self.labels['country'])
+        s = category_codes(df['store'], self.labels['store'])
+        p = category_codes(df['product'], self.labels['product'])
+        ok = (c >= 0) & (s >= 0) & (p >= 0)
+        code = (c * n_s + s) * n_p + p
+        out = np.full((day.max() - first + 1, self.n_bottom), np.nan)
+        out[day[ok] - first, code[ok]] = df[column].to_numpy(dtype=float)[ok]
+        dates = pd.date_range(pd.Timestamp(first, unit='D'), periods=len(out), freq='D')
+        return dates, out
+
+    def aggregate(self, bottom: np.ndarray) -> np.ndarray:
+        """All levels from (date, bottom) values: one sparse product for every date."""
+        bottom = np.asarray(bottom, dtype=float)
+        return np.hstack([(self.S_agg @ bottom.T).T, bottom])
+
+    def bottom_up(self, base: np.ndarray) -> np.ndarray:
+        return self.aggregate(np.asarray(base)[:, self.n_agg:])
+
+    def proportions(self, history: np.ndarray) -> np.ndarray:
+        """Share of each bottom series in the historical total, from (date, bottom) actuals."""
+        totals = np.nansum(history, axis=0)
+        return totals / totals.sum()
+
+    def top_down(self, base: np.ndarray, history: np.ndarray) -> np.ndarray:
+        """Split the total forecast by historical proportions of the bottom series."""
+        return self.aggregate(np.asarray(base)[:, :1] * self.proportions(history))
+
+    def mint(self, base: np.ndarray, variances: np.ndarray = None) -> np.ndarray:
+        """
+        Trace-minimising reconciliation with a diagonal W (WLS with one error
+        variance per series; OLS when `variances` is None). Uses the projection
+        y - W C' (C W C')^-1 C y, so the sparse system has one row per aggregate
+        node rather than per bottom series, and is factorised once and solved
+        for every date together.
+        """
+        base = np.asarray(base, dtype=float)
+        w = np.ones(self.n_series) if variances is None else np.maximum(np.asarray(variances, dtype=float), 1e-12)
+        W = sp.diags(w)
+        gap = self.C @ base.T                      # (agg, date) incoherence
+        system = (self.C @ W @ self.C.T).tocsc()   # (agg, agg), sparse
+        adjust = W @ (self.C.T @ splu(system).solve(np.ascontiguousarray(gap)))
+        return base - adjust.T
+
+    def reconcile(self, base: np.ndarray, method: str = 'mint', history: np.ndarray = None, residuals: np.ndarray = None):
+        """
+        Coherent (date, series) forecasts from `base` forecasts for every node.
+        'top_down' needs `history` (date, bottom) actuals; 'mint' uses the
+        per-series variance of in-sample `residuals` (date, series) when given.
+        """
+        if method == 'bottom_up':
+            return self.bottom_up(base)
+        if method == 'top_down':
+            if history is None:
+                raise ValueError("top_down needs the bottom-level history")
+            return self.top_down(base, history)
+        if method == 'ols':
+            return self.mint(base)
+        if method == 'mint':
+            return self.mint(base, None if residuals is None else np.nanvar(residuals, axis=0))
+        raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
@@ -0,0 +1,144 @@
+import os
+
+import numpy as np
+import pandas as pd
+from src.cube import SalesCube
+from src.profiling import stage
+
+
+AXES = ('country', 'store', 'product')
+
+
+class Rollups:
+    """
+    Precomputed EDA aggregates: the daily total and year x label totals per
+    category axis. Persisted with the data version they were built from, and
+    refreshed in place when dates are appended.
+    """
+    def __init__(self, version: str, dates: np.ndarray, daily: np.ndarray, years: np.ndarray, yearly: dict, labels: dict):
+        self.version = version
+        self.dates = dates      # datetime64[D]
+        self.daily = daily      # (date,)
+        self.years = years      # (year,)
+        self.yearly = yearly    # axis -> (year, label)
+        self.labels = labels    # axis -> labels
+
+    @staticmethod
+    def _yearly(cube: SalesCube, start: int = 0, end: int = None):
+        # year buckets of cube.dates[start:end], which must begin on a year boundary
+        years = cube.dates.year.to_numpy()[start:end]
+        starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+        part = cube.values[start:end]
+        yearly = {
+            axis: np.add.reduceat(
+                np.nansum(part, axis=tuple(a for a in (1, 2, 3) if a != n + 1)), starts, axis=0
+            )
+            for n, axis in enumerate(AXES)
+        }
+        return years[starts], yearly
+
+    @classmethod
+    def build(cls, cube: SalesCube, version: str):
+        years, yearly = cls._yearly(cube)
+        return cls(
+            version,
+            cube.dates.to_numpy().astype('datetime64[D]'),
+            cube.daily_total(),
+            years,
+            yearly,
+            {axis: cube.labels[axis] for axis in AXES},
+        )
+
+    def refresh(self, cube: SalesCube, version: str):
+        """
+        Bring the rollups up to `cube`. Appended dates only touch the daily tail
+        and the year buckets from the first new date on; anything else (new
+        labels, or edited history: old days or complete old years whose
+        totals no longer match the stored daily and year x label totals)
+        triggers a full rebuild. Edits that keep every stored total, e.g.
+        sales moved between two countries on the same day and back later
+        that year, leave the rollups correct and are not rebuilt.
+        """
+        if version == self.version:
+            return self
+        dates = cube.dates.to_numpy().astype('datetime64[D]')
+        n_old = len(self.dates)
+        appended = (
+            len(dates) > n_old
+            and np.array_equal(dates[:n_old], self.dates)
+            and all(np.array_equal(cube.labels[a], self.labels[a]) for a in AXES)
+            # the old days must still add up to the stored totals, or history was corrected
+            and np.allclose(np.nansum(cube.values[:n_old], axis=(1, 2, 3)), self.daily, rtol=1e-9, atol=0)
+        )
+        if appended:
+            first_year = cube.dates[n_old].year
+            keep = self.years < first_year
+            start = int(np.searchsorted(cube.dates.year.to_numpy(), first_year))
+            if start:
+                # corrections that move sales between labels keep the daily totals,
+                # but not the per-label totals of the complete years kept below
+                old_years, old_yearly = self._yearly(cube, 0, start)
+                appended = np.array_equal(old_years, self.years[keep]) and all(
+                    np.allclose(old_yearly[a], self.yearly[a][keep], rtol=1e-9, atol=0) for a in AXES
+                )
+        if not appended:
+            return self.build(cube, version)
+
+        years, yearly = self._yearly(cube, start)
+
+        self.daily = np.concatenate([self.daily, np.nansum(cube.values[n_old:], axis=(1, 2, 3))])
+        self.dates = dates
+        self.years = np.concatenate([self.years[keep], years])
+        self.yearly = {axis: np.concatenate([self.yearly[axis][keep], yearly[axis]]) for axis in AXES}
+        self.version = version
+        return self
+
+    def daily_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({'date': pd.DatetimeIndex(self.dates), 'num_sold': self.daily})
+
+    def yearly_frame(self, axis: str) -> pd.DataFrame:
+        """Long frame with `date` (year), `axis` and `num_sold` columns, as the EDA plots expect."""
+        labels = self.labels[axis]
+        return pd.DataFrame({
+            'date': np.repeat(self.years, len(labels)),
+            axis: np.tile(labels, len(self.years)),
+            'num_sold': self.yearly[axis].ravel(),
+        })
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        arrays = {f'yearly_{a}': self.yearly[a] for a in AXES}
+        arrays.update({f'labels_{a}': self.labels[a].astype(str) for a in AXES})
+        tmp = f'{path}.tmp.npz'
+        np.savez(tmp, version=self.version, dates=self.dates, daily=self.daily, years=self.years, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path, allow_pickle=False) as z:
+            return cls(
+                str(z['version']),
+                z['dates'],
+                z['daily'],
+                z['years'],
+                {a: z[f'yearly_{a}'] for a in AXES},
+                {a: z[f'labels_{a}'] for a in AXES},
+            )
+
+    @classmethod
+    @stage()
+    def open(cls, path: str, cube: SalesCube, version: str):
+        """Load the persisted rollups, refresh them to `version` if needed, and save any change."""
+        try:
+            rollups = cls.load(path)
+        except (OSError, KeyError, ValueError):
+            rollups = None
+        if rollups is not None and rollups.version == version:
+            return rollups
+
+        rollups = cls.build(cube, version) if rollups is None else rollups.refresh(cube, version)
+        try:
+            rollups.save(path)
+        except OSError:
+            pass
+        return rollups
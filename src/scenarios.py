@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from src.codes import category_codes
+from src.cube import SalesCube
+from src.forecaster import FactorForecaster
+
+
+# shock target -> cube axis it scales; the prediction is linear in every factor,
+# so a GDP shock and a country shock both scale (country, year) cells
+FACTORS = {'gdp': 'country', 'country': 'country', 'store': 'store', 'product': 'product'}
+AXES = ('country', 'store', 'product')
+
+
+def shock_frame(rows) -> pd.DataFrame:
+    """
+    Shocks as a frame with columns scenario, factor, label, year, multiplier.
+    `label` None means every label of the factor and `year` None every year,
+    e.g. ('Kenya GDP -10%', 'gdp', 'Kenya', 2019, 0.9).
+    """
+    return pd.DataFrame(list(rows), columns=['scenario', 'factor', 'label', 'year', 'multiplier'])
+
+
+class ScenarioEngine:
+    """
+    What-if evaluation of multiplicative shocks on the factor model. The
+    baseline forecast is computed once on the horizon grid (date, country,
+    store, product); a batch of scenarios becomes per-(scenario, year)
+    multipliers for each category axis, and every scenario is evaluated in
+    one broadcast against the baseline.
+    """
+    def __init__(self, model: FactorForecaster, frame: pd.DataFrame):
+        cube = SalesCube.from_frame(
+            frame.assign(_pred=model.predict(frame)), model.countries, model.stores, model.products, column='_pred'
+        )
+        self.dates = cube.dates
+        self.labels = cube.labels
+        self.baseline = np.nan_to_num(cube.values)                      # (date, country, store, product)
+        year = cube.dates.year.to_numpy()
+        self.years, self.year_index = np.unique(year, return_inverse=True)
+
+    @property
+    def n_series(self) -> int:
+        return self.baseline[0].size
+
+    def multipliers(self, shocks: pd.DataFrame, scenarios) -> dict:
+        """axis -> (scenario, year, label) multipliers; unknown scenarios, labels or years raise."""
+        scenarios = list(scenarios)
+        out = {axis: np.ones((len(scenarios), len(self.years), len(self.labels[axis]))) for axis in AXES}
+        if shocks.empty:
+            return out
+        unknown = set(shocks['factor']) - set(FACTORS)
+        if unknown:
+            raise ValueError(f"unknown factors {sorted(unknown)}, expected {list(FACTORS)}")
+        scen = category_codes(shocks['scenario'].astype(str), np.asarray(scenarios, dtype=str))
+        if (scen < 0).any():
+            raise ValueError(f"shocks for undeclared scenarios: {sorted(set(shocks['scenario'][scen < 0]))}")
+
+        year = pd.to_numeric(shocks['year'], errors='coerce').to_numpy()
+        all_years = np.isnan(year)
+        year_mask = all_years[:, None] | (year[:, None] == self.years[None, :])      # (shock, year)
+        if not year_mask.any(axis=1).all():
+            raise ValueError(f"years outside the horizon {self.years.min()}-{self.years.max()}")
+
+        for factor, axis in FACTORS.items():
+            rows = (shocks['factor'] == factor).to_numpy()
+            if not rows.any():
+                continue
+            labels = shocks['label'][rows]
+            every = (labels.isna() | (labels.astype(str) == '')).to_numpy()
+            code = category_codes(labels.astype(str).to_numpy(), np.asarray(self.labels[axis], dtype=str))
+            if ((code < 0) & ~every).any():
+                raise ValueError(f"unknown {axis} labels: {sorted(set(labels[(code < 0) & ~every]))}")
+            label_mask = every[:, None] | (code[:, None] == np.arange(len(self.labels[axis]))[None, :])
+            mult = shocks['multiplier'].to_numpy(dtype=float)[rows]
+            block = np.where(year_mask[rows][:, :, None] & label_mask[:, None, :], mult[:, None, None], 1.0)
+            np.multiply.at(out[axis], scen[rows], block)                   # shocks on the same cell compound
+        return out
+
+    def _weights(self, shocks, scenarios) -> np.ndarray:
+        # (scenario, year, series): the product of the three axis multipliers
+        m = self.multipliers(shocks, scenarios)
+        w = m['country'][:, :, :, None, None] * m['store'][:, :, None, :, None] * m['product'][:, :, None, None, :]
+        return w.reshape(len(m['country']), len(self.years), -1)
+
+    def simulate(self, shocks: pd.DataFrame, scenarios, chunk: int = None) -> np.ndarray:
+        """Forecast of every scenario as (scenario, date, series), `chunk` scenarios per broadcast."""
+        w = self._weights(shocks, scenarios)
+        base = self.baseline.reshape(len(self.dates), -1)
+        chunk = len(w) if chunk is None else chunk
+        out = np.empty((len(w), *base.shape))
+        for lo in range(0, len(w), chunk):
+            out[lo:lo + chunk] = base[None] * w[lo:lo + chunk][:, self.year_index]
+        return out
+
+    def totals(self, shocks: pd.DataFrame, scenarios, axis: str = None) -> np.ndarray:
+        """
+        Scenario totals per date, (scenario, date), or per date and label of
+        `axis`, (scenario, date, label), without building the full
+        (scenario, date, series) array: one matmul per horizon year.
+        """
+        w = self._weights(shocks, scenarios)
+        base = self.baseline.reshape(len(self.dates), -1)
+        if axis is None:
+            group = np.ones((base.shape[1], 1))
+        else:
+            n = AXES.index(axis)
+            idx = np.indices(self.baseline.shape[1:]).reshape(3, -1)[n]
+            group = np.eye(len(self.labels[axis]))[idx]                    # (series, label)
+        out = np.empty((len(w), len(self.dates), group.shape[1]))
+        for y in range(len(self.years)):
+            rows = self.year_index == y
+            # (scenario, series) weights times (date, series) baseline, summed into labels
+            out[:, rows] = np.einsum('ds,ns,sl->ndl', base[rows], w[:, y], group, optimize=True)
+        return out[..., 0] if axis is None else out
+
+    def summary(self, shocks: pd.DataFrame, scenarios) -> pd.DataFrame:
+        """Horizon and per-year totals of every scenario with the change against the unshocked baseline."""
+        totals = self.totals(shocks, scenarios)
+        by_year = np.stack([totals[:, self.year_index == y].sum(axis=1) for y in range(len(self.years))], axis=1)
+        baseline = self.baseline.sum()
+        frame = pd.DataFrame({'scenario': list(scenarios), 'num_sold': totals.sum(axis=1)})
+        frame['change_pct'] = 100 * (frame['num_sold'] / baseline - 1)
+        for y, year in enumerate(self.years):
+            frame[str(year)] = by_year[:, y]
+        return frame
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+import plotly.graph_objects as go
+from src.artifact import open_artifact
+from src.helper import EDA
+from src.scenarios import FACTORS, ScenarioEngine, shock_frame
+
+
+@st.cache_resource(show_spinner="Forecasting the baseline...")
+def scenario_engine():
+    # one baseline forecast of the test horizon, shared by every session
+    return ScenarioEngine(open_artifact().model, EDA().feate.test_df)
+
+
+DEFAULT_SHOCKS = shock_frame([
+    ('Kenya GDP -10%', 'gdp', 'Kenya', 2019, 0.9),
+    ('Premium Sticker Mart -5%', 'store', 'Premium Sticker Mart', None, 0.95),
+    ('Both', 'gdp', 'Kenya', 2019, 0.9),
+    ('Both', 'store', 'Premium Sticker Mart', None, 0.95),
+])
+
+
+def _sweep(factor, label, year, low, high, steps):
+    # one scenario per multiplier on an even grid
+    mults = np.linspace(low, high, steps)
+    names = [f'{factor} {label or "all"} x{m:.4f}' for m in mults]
+    return shock_frame((name, factor, label, year, m) for name, m in zip(names, mults))
+
+
+def scenarios_page():
+    st.title("🧪 What-if Scenarios")
+    st.markdown(
+        """
+        Multiplicative shocks on the **GDP**, **country**, **store** and **product** factors of the model,
+        evaluated against the forecast of the test horizon without re-running the feature pipeline.
+        Leave `label` empty to shock every label of a factor, and `year` empty to shock every year.
+        """
+    )
+    engine = scenario_engine()
+
+    with st.expander("✍️ Scenarios", expanded=True):
+        shocks = st.data_editor(
+            DEFAULT_SHOCKS,
+            num_rows="dynamic",
+            use_container_width=True,
+            column_config={
+                'factor': st.column_config.SelectboxColumn(options=list(FACTORS), required=True),
+                'year': st.column_config.NumberColumn(format="%d", min_value=int(engine.years.min()), max_value=int(engine.years.max())),
+                'multiplier': st.column_config.NumberColumn(min_value=0.0, step=0.01, required=True),
+            },
+            key="scenario_shocks",
+        ).dropna(subset=['scenario', 'factor', 'multiplier'])
+
+    with st.expander("🔁 Sweep", expanded=False):
+        sweep = st.toggle("Add a multiplier sweep", value=False)
+        col1, col2, col3 = st.columns(3)
+        factor = col1.selectbox("Factor", list(FACTORS))
+        label = col2.selectbox("Label", ["(all)", *engine.labels[FACTORS[factor]]])
+        year = col3.selectbox("Year", ["(all)", *engine.years.tolist()])
+        low, high = st.slider("Multiplier range", 0.5, 1.5, (0.8, 1.2), step=0.01)
+        steps = st.number_input("Scenarios", min_value=2, max_value=20000, value=1000, step=100)
+        if sweep:
+            shocks = pd.concat([
+                shocks,
+                _sweep(factor, None if label == "(all)" else label, None if year == "(all)" else year, low, high, int(steps)),
+            ], ignore_index=True)
+
+    scenarios = ['baseline', *dict.fromkeys(shocks['scenario'].astype(str))]
+    try:
+        summary = engine.summary(shocks, scenarios)
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Scenarios", len(scenarios) - 1)
+    col2.metric("Series × days", f"{engine.n_series} × {len(engine.dates)}")
+    col3.metric("Baseline units", f"{summary['num_sold'].iloc[0]:,.0f}")
+
+    with st.expander("📋 Scenario Totals", expanded=True):
+        st.dataframe(summary.round(2), use_container_width=True, hide_index=True)
+        if len(summary) <= 50:
+            fig = px.bar(summary, x='scenario', y='change_pct', title='Change Against the Baseline (%)')
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            fig = px.scatter(summary, x=summary.index, y='change_pct', hover_name='scenario',
+                             title='Change Against the Baseline (%)', labels={'x': 'scenario'})
+            st.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("📈 Daily Forecast", expanded=True):
+        axis = st.selectbox("Break down by", ["(total)", "country", "store", "product"])
+        picked = st.multiselect("Scenarios", scenarios, default=scenarios[:min(len(scenarios), 4)])
+        if picked:
+            subset = shocks[shocks['scenario'].astype(str).isin(picked)]
+            totals = engine.totals(subset, picked, None if axis == "(total)" else axis)
+            fig = go.Figure()
+            if axis == "(total)":
+                for name, series in zip(picked, totals):
+                    fig.add_trace(go.Scatter(x=engine.dates, y=series, name=name, mode='lines'))
+            else:
+                for name, table in zip(picked, totals):
+                    for label, series in zip(engine.labels[axis], table.T):
+                        fig.add_trace(go.Scatter(x=engine.dates, y=series, name=f'{name} · {label}', mode='lines'))
+            fig.update_layout(title='Forecast num_sold per Day', xaxis_title='Date', yaxis_title='num_sold', height=450)
+            st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,210 @@
+"""
+Local batch prediction service.
+
+    python -m src.service --port 8502
+
+POST /predict with one row or a list of rows, each with `date`, `country`,
+`store` and `product`; the response is {"num_sold": [...]} in request order.
+GET /health reports readiness. Requests arriving together are coalesced into
+one vectorized Feategg + FactorForecaster call.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+from src.codes import category_codes
+from src.artifact import open_artifact
+from src.data import load_data
+from src.feategg import Feategg
+from src.forecaster import FactorForecaster
+
+
+KEYS = ('date', 'country', 'store', 'product')
+
+
+class Predictor:
+    """Fitted model plus the feature path for raw (date, country, store, product) rows."""
+    def __init__(self, model: FactorForecaster):
+        self.model = model
+        # the model's own labels (from the artifact when opened), so serving never loads the CSVs
+        self.labels = {'country': model.countries, 'store': model.stores, 'product': model.products}
+
+    @classmethod
+    def open(cls):
+        # factors come from the memory-mapped artifact, shared by every serving process
+        return cls(open_artifact().model)
+
+    @classmethod
+    def fit(cls):
+        feate = Feategg(load_data(), features=FactorForecaster().features)
+        return cls(FactorForecaster().fit(feate.train_df))
+
+    def frame(self, columns: dict) -> pd.DataFrame:
+        """Typed frame from column lists; unknown labels and bad dates become NaN / NaT."""
+        rows = {'date': pd.to_datetime(pd.Series(columns['date'], dtype=object), format='%Y-%m-%d', errors='coerce')}
+        for axis, labels in self.labels.items():
+            rows[axis] = pd.Categorical.from_codes(category_codes(columns[axis], labels), categories=labels)
+        return pd.DataFrame(rows)
+
+    def invalid(self, rows: pd.DataFrame) -> np.ndarray:
+        bad = rows['date'].isna().to_numpy().copy()
+        for axis in self.labels:
+            bad |= rows[axis].cat.codes.to_numpy() < 0
+        return bad
+
+    def explain(self, rows: pd.DataFrame) -> str:
+        problems = []
+        if rows['date'].isna().any():
+            problems.append("dates must be YYYY-MM-DD")
+        for axis, labels in self.labels.items():
+            if rows[axis].isna().any():
+                problems.append(f"{axis} must be one of {list(labels)}")
+        return "; ".join(problems)
+
+    def predict(self, rows: pd.DataFrame) -> np.ndarray:
+        """Predictions for `rows`, NaN where the row is invalid."""
+        bad = self.invalid(rows)
+        pred = np.full(len(rows), np.nan)
+        if not bad.all():
+            valid = rows[~bad]
+            pred[~bad] = self.model.predict(Feategg.feature_eng(valid, features=self.model.features))
+        return pred
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent submissions into one vectorized call: while a batch
+    is running, new requests queue up and the next batch takes all of them
+    (up to `max_rows`), waiting at most `max_wait` seconds for stragglers.
+    """
+    def __init__(self, predictor: Predictor, max_rows: int = 8192, max_wait: float = 0.0005):
+        self.predictor = predictor
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def submit(self, columns: dict) -> Future:
+        future = Future()
+        self.queue.put((columns, future))
+        return future
+
+    def _loop(self):
+        while True:
+            batch = [self.queue.get()]
+            n_rows = len(batch[0][0]['date'])
+            deadline = time.perf_counter() + self.max_wait
+            while n_rows < self.max_rows:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                batch.append(item)
+                n_rows += len(item[0]['date'])
+
+            try:
+                self._run(batch)
+            except Exception:
+                # one request broke the coalesced call: rerun them alone so only it fails
+                for item in batch:
+                    try:
+                        self._run([item])
+                    except Exception as e:
+                        item[1].set_exception(e)
+
+    def _run(self, batch):
+        columns = {k: [v for cols, _ in batch for v in cols[k]] for k in KEYS}
+        rows = self.predictor.frame(columns)
+        pred = self.predictor.predict(rows)
+
+        start = 0
+        for cols, future in batch:
+            end = start + len(cols['date'])
+            if np.isnan(pred[start:end]).any():
+                future.set_exception(ValueError(self.predictor.explain(rows.iloc[start:end])))
+            else:
+                future.set_result(pred[start:end])
+            start = end
+
+
+def _field(row: dict, key: str) -> str:
+    # every field is a scalar label or date; anything else is the client's error, not the batch's
+    value = row[key]
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise TypeError(f"{key} must be a string, got {type(value).__name__}")
+    return str(value)
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # bursts of thousands of queries must not be reset at accept()
+
+
+def make_handler(batcher: MicroBatcher):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send(200, {'status': 'ok'})
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send(404, {'error': 'not found'})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                rows = body.get('rows', body) if isinstance(body, dict) else body
+                rows = rows if isinstance(rows, list) else [rows]
+                columns = {k: [_field(row, k) for row in rows] for k in KEYS}
+            except KeyError as e:
+                self._send(400, {'error': f"missing field: {e.args[0]}"})
+                return
+            except (ValueError, TypeError, AttributeError) as e:
+                self._send(400, {'error': str(e)})
+                return
+            try:
+                pred = batcher.submit(columns).result()
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+                return
+            except Exception as e:
+                self._send(500, {'error': f"{type(e).__name__}: {e}"})
+                return
+            self._send(200, {'num_sold': pred.round(3).tolist()})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host: str = '127.0.0.1', port: int = 8502, max_rows: int = 8192, max_wait: float = 0.0005):
+    batcher = MicroBatcher(Predictor.open(), max_rows, max_wait)
+    server = Server((host, port), make_handler(batcher))
+    print(f"serving predictions on http://{host}:{port}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--max-rows', type=int, default=8192, help='largest coalesced batch')
+    parser.add_argument('--max-wait', type=float, default=0.0005, help='seconds to wait for more requests')
+    args = parser.parse_args()
+    serve(args.host, args.port, args.max_rows, args.max_wait)
@@ -0,0 +1,135 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from src.cfg import CFG
+from src.codes import day_codes
+from src.cube import SalesCube
+from src.feategg import HARMONICS
+from src.fft_filter import DAYS_PER_YEAR, fill_nan
+from src.forecaster import batched_ridge
+
+
+def harmonics_by_date(frame: pd.DataFrame, dates: pd.DatetimeIndex, columns) -> np.ndarray:
+    """(date, basis) design taken from a Feategg frame, one row per entry of `dates` (0 where absent)."""
+    day = day_codes(frame['date'])
+    first = day_codes(dates[:1])[0]
+    pos = day - first
+    ok = (pos >= 0) & (pos < len(dates))
+    design = np.zeros((len(dates), len(columns)))
+    design[pos[ok]] = frame[list(columns)].to_numpy(dtype=float)[ok]
+    return design
+
+
+def periodogram(values: np.ndarray):
+    """
+    Power spectrum of every column of `values` (date, series) from one rfft.
+    Returns frequencies in cycles per year and power of shape (freq, series).
+    """
+    x = fill_nan(np.asarray(values, dtype=float))
+    x = x - x.mean(axis=0)
+    power = np.abs(np.fft.rfft(x, axis=0)) ** 2 / len(x)
+    freq = np.fft.rfftfreq(len(x)) * DAYS_PER_YEAR
+    return freq[1:], power[1:]
+
+
+def fit_sincos(values: np.ndarray, basis: np.ndarray, alpha: float = 0.1) -> np.ndarray:
+    """
+    Least-squares fit of every column of `values` (date, series) on the shared
+    sin/cos `basis` (date, k) plus an intercept, in one batched solve. Missing
+    days are left out of each series' fit; series with too few points give NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    mask = np.isfinite(values)
+    fitted = np.full(values.shape, np.nan)
+    enough = mask.sum(axis=0) > basis.shape[1] + 1
+    if enough.any():
+        icpt, coef = batched_ridge(basis, values[:, enough], mask[:, enough], alpha)
+        fitted[:, enough] = icpt + basis @ coef.T
+    return fitted
+
+
+def basis_candidates(harmonics=HARMONICS) -> list:
+    """Every subset of the sin/cos pairs in `harmonics` (a pair enters or leaves together), smallest first."""
+    pairs = [[n for n in harmonics if n.split(' ', 1)[1] == freq] for freq in dict.fromkeys(n.split(' ', 1)[1] for n in harmonics)]
+    return [sum(subset, []) for k in range(len(pairs) + 1) for subset in combinations(pairs, k)]
+
+
+def score_bases(values: np.ndarray, design: np.ndarray, names, valid: np.ndarray, candidates, alpha: float = 1e-6) -> np.ndarray:
+    """
+    Validation RMSE of every candidate basis for every column of `values`
+    (date, series), fitted on the dates outside `valid`. `design` (date, k)
+    holds all harmonic columns `names`; each candidate uses a slice of it plus
+    an intercept. Series without gaps in the fit window share one
+    pseudo-inverse per candidate (one matmul for all of them); series with
+    gaps are solved together from their masked normal equations. Returns
+    (candidate, series); NaN where a series has no fit or validation data.
+    """
+    values = np.asarray(values, dtype=float)
+    fit = ~valid
+    known = np.isfinite(values)
+    complete = known[fit].all(axis=0)
+    gappy = known[fit].any(axis=0) & ~complete
+    has_valid = known[valid].any(axis=0) & (complete | gappy)
+    scores = np.full((len(candidates), values.shape[1]), np.nan)
+    names = list(names)
+
+    for k, candidate in enumerate(candidates):
+        x = design[:, [names.index(c) for c in candidate]]
+        x = x[:, np.abs(x[fit]).max(axis=0, initial=0) > 1e-9]  # (numerically) zero columns such as sin t/2 carry nothing
+        pred = np.full_like(values, np.nan)
+        if complete.any():
+            xa = np.column_stack([np.ones(len(x)), x])
+            pred[:, complete] = xa @ (np.linalg.pinv(xa[fit]) @ values[fit][:, complete])
+        if gappy.any():
+            icpt, coef = batched_ridge(x[fit], values[fit][:, gappy], known[fit][:, gappy], alpha)
+            pred[:, gappy] = icpt + x @ coef.T
+        err = np.where(known[valid], pred[valid] - values[valid], 0.0)
+        scores[k, has_valid] = np.sqrt((err ** 2).sum(axis=0) / np.maximum(known[valid].sum(axis=0), 1))[has_valid]
+    return scores
+
+
+def select_bases(frame: pd.DataFrame, validation_year: int = None, candidates=None):
+    """
+    Best harmonic basis per country x store x product series of a Feategg
+    training frame. Each series is scaled by its yearly mean, so candidates
+    compete on the seasonal shape, not the level, and the one with the lowest
+    RMSE on `validation_year` wins. The default is CFG.validation_year when it
+    is labelled, otherwise the last labelled year. Returns the per-series
+    choice and the full (series x candidate) score table.
+    """
+    candidates = basis_candidates() if candidates is None else [list(c) for c in candidates]
+    labelled = frame[frame['num_sold'].notna()]
+    years = labelled['date'].dt.year.unique()
+    if validation_year is None:
+        validation_year = CFG.validation_year if CFG.validation_year in years else int(years.max())
+    elif validation_year not in years:
+        raise ValueError(f"no labelled sales in validation year {validation_year}")
+
+    cube = SalesCube.from_frame(labelled)
+    values = cube.values.reshape(len(cube.dates), -1)
+    year = cube.dates.year.to_numpy()
+    starts = np.flatnonzero(np.r_[True, year[1:] != year[:-1]])
+    known = np.isfinite(values)
+    sums = np.add.reduceat(np.where(known, values, 0.0), starts, axis=0)
+    counts = np.add.reduceat(known, starts, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        level = (sums / counts)[np.searchsorted(starts, np.arange(len(year)), side='right') - 1]
+        shape = values / level
+
+    names = list(dict.fromkeys(c for candidate in candidates for c in candidate))
+    design = harmonics_by_date(labelled, cube.dates, names)
+    scores = score_bases(shape, design, names, year == validation_year, candidates)
+
+    best = np.where(np.isfinite(scores).any(axis=0), np.nanargmin(np.where(np.isfinite(scores), scores, np.inf), axis=0), -1)
+    idx = np.indices([len(cube.labels[a]) for a in ('country', 'store', 'product')]).reshape(3, -1)
+    choice = pd.DataFrame({
+        'country': cube.labels['country'][idx[0]],
+        'store': cube.labels['store'][idx[1]],
+        'product': cube.labels['product'][idx[2]],
+        'basis': [', '.join(candidates[b]) if b >= 0 else None for b in best],
+        'rmse': np.where(best >= 0, scores[np.maximum(best, 0), np.arange(len(best))], np.nan),
+        'baseline_rmse': scores[candidates.index([])] if [] in candidates else np.nan,
+    })
+    table = pd.DataFrame(scores.T, columns=[', '.join(c) or '(intercept)' for c in candidates])
+    return choice, table